@@ -1,7 +1,11 @@
 import requests
 import time
 import json
+import os
+import tempfile
+import threading
 from datetime import datetime
+from web3 import Web3
 from uniswapTrader import UniswapTrader
 from zoneinfo import ZoneInfo
 
@@ -19,14 +23,21 @@ class AdvancedTradingBot:
         profit_stop,       # e.g., -10 means -$10 net loss => sell all,
         initial_balance_usdc,
         wallet_address,
-        private_key=None
+        private_key=None,
+        profiler=None,     # optional RunProfiler for per-tick timing
+        trader_coin=None,  # token symbol from tokens.json, if coin_id is not in trader_coins
+        trader=None,       # optional shared UniswapTrader for this wallet
+        price_client=None  # optional shared PriceClient
     ):
         self.coin_id = coin_id
 
-        try:
-         self.trader_coin = self.trader_coins[coin_id]
-        except KeyError:
-            pass
+        if trader_coin:
+            self.trader_coin = trader_coin
+        else:
+            try:
+             self.trader_coin = self.trader_coins[coin_id]
+            except KeyError:
+                pass
         
         self.profit_take = profit_take  # Sell all if net_profit >= this
         self.profit_stop = profit_stop  # Sell all if net_profit <= this
@@ -36,10 +47,13 @@ class AdvancedTradingBot:
         self.wallet_address = wallet_address
         self.private_key = private_key
 
-        self.trader = UniswapTrader(
-            wallet_address=wallet_address,
-            private_key=private_key,
-        ) if private_key else None
+        if trader is None and private_key:
+            trader = UniswapTrader(
+                wallet_address=wallet_address,
+                private_key=private_key,
+            )
+        self.trader = trader
+        self.price_client = price_client
                 
         # Balances
         self.usdc_balance = initial_balance_usdc
@@ -52,6 +66,8 @@ class AdvancedTradingBot:
         self.cg_api_url = f"https://api.coingecko.com/api/v3/coins/{self.coin_id}"
         
         self.running = True
+        # Set by terminate() to cut the wait between ticks short
+        self.stop_event = threading.Event()
 
         # RSI settings
         self.rsi_period = 14 # CHANGE (period for RSI calculation -> 14)
@@ -59,12 +75,26 @@ class AdvancedTradingBot:
 
         # Track initial capital for net profit
         self.initial_capital = initial_balance_usdc
+
+        self.profiler = profiler
+
+        # Crash-safe state snapshots, rewritten every tick and whenever a transaction is sent or confirmed
+        # Checksummed so the same wallet maps to the same file however its address was typed
+        state_address = Web3.to_checksum_address(wallet_address) if Web3.is_address(wallet_address) else wallet_address
+        self.state_file = os.path.join("state", f"{state_address}_{self.coin_id}.json")
+        # save_state also runs from other bots' threads when they share this bot's trader
+        self.state_lock = threading.Lock()
+        if self.trader:
+            self.trader.pending_listeners.append(self.save_state)
         
     def terminate(self):
         """Terminate the bot loop."""
         self.running = False
+        self.stop_event.set()
 
     def get_advanced_price_data(self):
+        if self.price_client:
+            return self.price_client.get_price_data(self.coin_id)
         try:
             response = requests.get(
                 self.cg_api_url,
@@ -138,27 +168,202 @@ class AdvancedTradingBot:
         with open("trades.json", "w") as f:
             f.write("")
 
+    def save_state(self):
+        """Atomically writes the bot state and any pending transaction hashes to state_file."""
+        with self.state_lock:
+            self.write_state()
+
+    def write_state(self):
+        state = {
+            "timestamp": time.time(),
+            "coin_id": self.coin_id,
+            "usdc_balance": float(self.usdc_balance),
+            "coin_balance": float(self.coin_balance),
+            "holding": self.holding,
+            "baseline_price": self.baseline_price,
+            "price_history": list(self.price_history),
+            "initial_capital": self.initial_capital,
+            "pending_transactions": self.trader.get_pending_hashes(owner=self.state_file) if self.trader else {},
+            "active_trade": self.get_active_trade(),
+        }
+        state_dir = os.path.dirname(self.state_file)
+        os.makedirs(state_dir, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=state_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.state_file)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+    def get_active_trade(self):
+        """This bot's trade in progress on the (possibly shared) trader, if any."""
+        active_trade = self.trader.active_trade if self.trader else None
+        if active_trade is not None and active_trade.get("owner") == self.state_file:
+            return dict(active_trade)
+        return None
+
+    def load_state(self):
+        """Returns the last saved state, or None if there is none."""
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def resume_state(self):
+        """
+        Restores the last saved state and reconciles it with the chain.
+        Returns False if there is no saved state to resume from.
+        """
+        state = self.load_state()
+        if state is None or state.get("coin_id") != self.coin_id:
+            return False
+
+        self.usdc_balance = state["usdc_balance"]
+        self.coin_balance = state["coin_balance"]
+        self.holding = state["holding"]
+        self.baseline_price = state["baseline_price"]
+        self.price_history = state["price_history"]
+        self.initial_capital = state["initial_capital"]
+        print(f"Resumed state from {self.state_file} (saved {time.time() - state['timestamp']:.0f} seconds ago)")
+
+        if self.trader:
+            self.reconcile_state(state.get("pending_transactions", {}), state.get("active_trade"))
+        return True
+
+    def reconcile_state(self, pending_transactions, active_trade=None):
+        """
+        Checks the restored balances against the chain with one batched read.
+        Transactions that were in flight at crash time are awaited instead of
+        being sent again (unless the node has dropped them), a trade interrupted
+        between its two legs is finished (or its leftover ETH reported), and
+        balances are capped at what the wallet really holds. Settled nonces and
+        the finished trade are then cleared from the trader.
+        """
+        coin_symbol = None if self.trader_coin == "WETH_BASE" else self.trader_coin
+        balances, latest_nonce = self.trader.get_account_snapshot(
+            self.wallet_address, ["USDC_BASE", coin_symbol]
+        )
+
+        mined, still_pending = False, False
+        for nonce, hashes in pending_transactions.items():
+            if int(nonce) < latest_nonce:
+                print(f"✅ Transaction with nonce {nonce} was mined while the bot was down.")
+                mined = True
+                self.trader.forget_transaction(int(nonce))
+                continue
+            if not self.trader.is_known(hashes):
+                print(f"⚠️ Transaction with nonce {nonce} was dropped by the node, it will not be mined.")
+                self.trader.forget_transaction(int(nonce))
+                continue
+            print(f"⏳ Waiting for in-flight transaction with nonce {nonce}: {hashes}")
+            receipt = self.trader.wait_for_any_receipt(hashes, time.time() + self.trader.trade_timeout)
+            if receipt is None:
+                print(f"⚠️ Transaction with nonce {nonce} is still pending, check it manually.")
+                still_pending = True
+            else:
+                mined = True
+                self.trader.forget_transaction(int(nonce))
+                balances, latest_nonce = self.trader.get_account_snapshot(
+                    self.wallet_address, ["USDC_BASE", coin_symbol]
+                )
+
+        if active_trade and self.resume_trade(active_trade, mined, still_pending):
+            balances, latest_nonce = self.trader.get_account_snapshot(
+                self.wallet_address, ["USDC_BASE", coin_symbol]
+            )
+        if not still_pending:
+            self.trader.clear_active_trade(self.state_file)
+
+        onchain_usdc = balances["USDC_BASE"]
+        onchain_coin = balances[coin_symbol]
+        if onchain_usdc < self.usdc_balance:
+            print(f"⚠️ USDC balance on chain (${onchain_usdc:.2f}) is lower than saved (${self.usdc_balance:.2f}), using on-chain value.")
+            self.usdc_balance = onchain_usdc
+        if onchain_coin < self.coin_balance:
+            print(f"⚠️ {self.coin_id.upper()} balance on chain ({onchain_coin:.6f}) is lower than saved ({self.coin_balance:.6f}), using on-chain value.")
+            self.coin_balance = onchain_coin
+        self.save_state()
+
+    def resume_trade(self, active_trade, mined, still_pending):
+        """
+        Handles a two-step trade (input → ETH → output) that was running at crash time.
+        Returns True if a swap was sent to finish it.
+        """
+        route = f"{active_trade['input']} → ETH → {active_trade['output']}"
+        if still_pending:
+            print(f"⚠️ Trade {route} still has a pending transaction, not resuming it.")
+        elif active_trade["completed_leg"] == 0:
+            if mined:
+                print(f"⚠️ Trade {route} was interrupted after swapping {active_trade['input']} → ETH. "
+                      f"The ETH is still in the wallet; swap it to {active_trade['output']} manually.")
+            else:
+                print(f"⚠️ Trade {route} was interrupted and none of its swaps is known to be mined. "
+                      f"If the wallet holds extra ETH, swap it to {active_trade['output']} manually.")
+        elif mined:
+            print(f"✅ Trade {route} finished while the bot was down.")
+            self.apply_resumed_action(active_trade)
+        else:
+            print(f"🔄 Finishing trade {route}: swapping ETH → {active_trade['output']}...")
+            self.trader.finish_trade(active_trade)
+            self.apply_resumed_action(active_trade)
+            return True
+        return False
+
+    def apply_resumed_action(self, active_trade):
+        """
+        Records a trade finished after a restart the way run() would have.
+        BUY and SELL moved the balances before the trade was sent, so only the
+        log entry is missing; full sells also credit the USDC and stop the bot.
+        """
+        action = active_trade.get("action")
+        if not action:
+            return
+        if action["name"].startswith("FULL_SELL"):
+            self.usdc_balance += action["amount"] * action["price"]
+            self.coin_balance = 0
+            self.terminate()
+        self.log_trade(action["name"], action["amount"], action["price"])
+
     def get_portfolio_value(self, current_price):
         """Total USD value of USDC + token holdings."""
         return float(self.usdc_balance) + (float(self.coin_balance) * float(current_price))
 
-    def run(self):
+    def run(self, resume=False, clear_log=True):
+        """
+        Runs the trading loop. With resume=True, continues from the last saved state if there is one.
+        clear_log=False keeps trades.json when starting fresh (e.g. when it is shared by several bots).
+        """
         count = 0
         print(f"Starting advanced trading bot for {self.coin_id} on wallet {self.wallet_address}...")
         
         print("----------------------------------------------------------\n")
 
-        self.clear_trade_log()
+        resumed = resume and self.resume_state()
+        if not resumed and clear_log:
+            self.clear_trade_log()
 
         while self.running:
             print("----------------------------------------------------------")
             print("Iteration:", count)
             count += 1
-            
+
+            if self.profiler:
+                self.profiler.tick_start()
+
             data = self.get_advanced_price_data()
+            if self.profiler:
+                self.profiler.mark("fetch_price")
             if data is None:
                 print("Skipping this interval due to API error.")
-                time.sleep(self.check_interval)
+                if self.profiler:
+                    self.profiler.tick_end()
+                self.stop_event.wait(self.check_interval)
                 continue
 
             current_price = data["current_price"]
@@ -189,6 +394,9 @@ class AdvancedTradingBot:
                 needed = self.rsi_period - len(self.price_history)
                 print(f"RSI: waiting for {needed} more prices...")
 
+            if self.profiler:
+                self.profiler.mark("indicators")
+
             # === Step 1: Check forced profit take / stop loss ===
             if self.coin_balance > 0:
                 if net_profit >= self.profit_take:
@@ -196,7 +404,8 @@ class AdvancedTradingBot:
 
                     if self.trader:
                         print(f"Net profit >= {self.profit_take:.2f} => SELL ALL")
-                        self.trader.trade(self.trader_coin, "USDC_BASE", self.coin_balance, slippage=1)
+                        self.trader.trade(self.trader_coin, "USDC_BASE", self.coin_balance, slippage=1, owner=self.state_file,
+                                          action={"name": "FULL_SELL_PROFIT", "amount": self.coin_balance, "price": current_price})
                         usdc_gained = self.coin_balance * current_price
                         self.usdc_balance += usdc_gained
                         self.log_trade("FULL_SELL_PROFIT", self.coin_balance, current_price)
@@ -207,7 +416,8 @@ class AdvancedTradingBot:
 
                     if self.trader:
                         print(f"Net profit <= {self.profit_stop:.2f} => SELL ALL")
-                        self.trader.trade(self.trader_coin, "USDC_BASE", self.coin_balance, slippage=1)
+                        self.trader.trade(self.trader_coin, "USDC_BASE", self.coin_balance, slippage=1, owner=self.state_file,
+                                          action={"name": "FULL_SELL_STOPLOSS", "amount": self.coin_balance, "price": current_price})
 
                         usdc_gained = self.coin_balance * current_price
                         self.usdc_balance += usdc_gained
@@ -234,7 +444,8 @@ class AdvancedTradingBot:
                             self.coin_balance += amount_to_buy
                             self.usdc_balance -= amount_to_invest
                             print(f"RSI BUY => bought {amount_to_buy:.6f} {self.coin_id.upper()} at ${current_price:.2f} (~${amount_to_buy * current_price:.2f})")
-                            self.trader.trade("USDC_BASE", self.trader_coin, amount_to_invest, slippage=1)
+                            self.trader.trade("USDC_BASE", self.trader_coin, amount_to_invest, slippage=1, owner=self.state_file,
+                                              action={"name": "BUY", "amount": amount_to_buy, "price": current_price})
                             self.log_trade("BUY", amount_to_buy, current_price)
 
                     else:
@@ -253,7 +464,8 @@ class AdvancedTradingBot:
                             self.usdc_balance += usdc_gained
                             self.coin_balance -= amount_to_sell
                             print(f"RSI SELL => sold {amount_to_sell:.6f} {self.coin_id.upper()} at ${current_price:.2f} (~${amount_to_sell * current_price:.2f})")
-                            self.trader.trade(self.trader_coin, "USDC_BASE", amount_to_sell, slippage=1)
+                            self.trader.trade(self.trader_coin, "USDC_BASE", amount_to_sell, slippage=1, owner=self.state_file,
+                                              action={"name": "SELL", "amount": amount_to_sell, "price": current_price})
                             self.log_trade("SELL", amount_to_sell, current_price)
                             
                     else:
@@ -265,9 +477,15 @@ class AdvancedTradingBot:
             final_profit = final_value - self.initial_capital
             print(f"USDC Balance: ${self.usdc_balance:.2f} | {self.coin_id.upper()} Balance: {float(self.coin_balance):.6f} (~${float(self.coin_balance) * current_price:.2f})")
             print(f"Current Net Profit: ${final_profit:.2f}")
+            self.save_state()
+            if self.profiler:
+                self.profiler.mark("trading")
+                self.profiler.tick_end()
             print(f"Waiting {self.check_interval} seconds...\n")
             print("----------------------------------------------------------\n")
-            time.sleep(self.check_interval)
+            self.stop_event.wait(self.check_interval)
+
+        self.save_state()
 
     def print_final_summary(self, current_price):
         final_value = self.get_portfolio_value(current_price)
@@ -276,6 +494,30 @@ class AdvancedTradingBot:
         print(f"Final Portfolio Value: ${final_value:.2f}")
         print(f"Final Net Profit: ${final_profit:.2f}")
         print(f"Final USDC Balance: ${self.usdc_balance:.2f}, Final {self.coin_id.upper()} Balance: {self.coin_balance:.6f} (~${self.coin_balance * current_price:.2f})")
+        if self.profiler:
+            self.profiler.print_summary()
 
     def get_usdc_balance(self):
         return self.trader.get_balance(self.wallet_address)
+
+    def precheck(self, resume=False, min_eth_balance=0.0005, required_usdc=None):
+        """
+        Checks the wallet can fund the bot and pay gas, using one batched read.
+        required_usdc is the capital every bot starting on this wallet needs
+        together (defaults to this bot's initial capital).
+        Returns a list of problems (empty if the bot is ready to run).
+        """
+        problems = []
+        balances, _ = self.trader.get_account_snapshot(self.wallet_address, ["USDC_BASE", None])
+        usdc_balance = balances["USDC_BASE"]
+        eth_balance = balances[None]
+        if required_usdc is None:
+            required_usdc = self.initial_capital
+
+        # When resuming, part of the balance may already be in the coin
+        if not resume and usdc_balance < required_usdc:
+            shared = " (all bots on this wallet)" if required_usdc != self.initial_capital else ""
+            problems.append(f"❌ Insufficient USDC balance. Required: ${required_usdc:.2f}{shared}, found: ${usdc_balance:.2f}")
+        if eth_balance < min_eth_balance:
+            problems.append(f"⚠️ Warning: ETH balance is very low ({eth_balance:.5f}). You may not be able to pay gas fees.")
+        return problems
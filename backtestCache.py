@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+def code_version(*paths):
+    """Hash of the given source files, so any code change invalidates the cache."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class BacktestCache:
+    """
+    Persistent cache of backtest results (equity curve, trades and summary).
+
+    Each result is stored as one JSON file named after a hash of the price series,
+    the strategy parameters and the code version. Reads refresh the file's mtime,
+    and the least recently used files are evicted once the cache exceeds max_bytes.
+    Safe to share between processes running sweeps in parallel.
+    """
+    def __init__(self, cache_dir=".backtest_cache", max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, historical_prices, params, version):
+        digest = hashlib.sha256()
+        digest.update(json.dumps(historical_prices, separators=(",", ":")).encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        digest.update(version.encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Returns the cached result for key, or None if it is not cached."""
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass  # evicted by another process meanwhile
+        return result
+
+    def put(self, key, result):
+        """Atomically stores result under key and evicts old entries if needed."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
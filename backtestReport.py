@@ -0,0 +1,96 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+BUY_ACTIONS = ("BUY",)
+SELL_ACTIONS = ("SELL", "FULL_SELL_PROFIT", "FULL_SELL_STOPLOSS")
+
+
+def downsample(values, max_points):
+    """
+    Indices that keep the min and max of each bucket, so peaks and drawdowns
+    survive when a long series is reduced to about max_points points.
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+
+    nan = np.isnan(values)
+    if nan.all():
+        return np.linspace(0, n - 1, max_points).astype(int)
+    filled = np.where(nan, np.nanmin(values), values)
+    edges = np.linspace(0, n, max(1, max_points // 2) + 1).astype(int)
+    indices = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            segment = filled[start:end]
+            indices.append(start + int(np.argmin(segment)))
+            indices.append(start + int(np.argmax(segment)))
+    return np.unique(indices)
+
+
+def render_report(series, trades, path, title="Backtest", initial_capital=None, max_points=2000,
+                  rsi_buy_threshold=30, rsi_sell_threshold=70):
+    """
+    Renders price with trade signals, RSI, equity and drawdown into an image file.
+    Uses the Agg canvas directly, so it works headless and leaves no global pyplot state.
+
+    :param series: Dict of equal-length lists: timestamp (ms), price, equity, position, rsi
+    :param trades: List of trade dicts with timestamp (ms), action and price
+    """
+    timestamps = np.asarray(series["timestamp"], dtype="datetime64[ms]")
+    price = np.asarray(series["price"], dtype=float)
+    equity = np.asarray(series["equity"], dtype=float)
+    rsi = np.array([np.nan if value is None else value for value in series["rsi"]], dtype=float)
+
+    if len(equity) == 0:
+        raise ValueError("Cannot render a report for an empty series.")
+
+    running_max = np.maximum.accumulate(equity)
+    drawdown = (equity / running_max - 1) * 100
+
+    fig = Figure(figsize=(12, 10))
+    FigureCanvasAgg(fig)
+    ax_price, ax_rsi, ax_equity, ax_drawdown = fig.subplots(
+        4, 1, sharex=True, gridspec_kw={"height_ratios": [3, 1, 2, 1]}
+    )
+
+    idx = downsample(price, max_points)
+    ax_price.plot(timestamps[idx], price[idx], linewidth=0.8, color="tab:gray")
+    for actions, marker, color, label in ((BUY_ACTIONS, "^", "tab:green", "Buy"),
+                                          (SELL_ACTIONS, "v", "tab:red", "Sell")):
+        points = [t for t in trades if t["action"] in actions]
+        if points:
+            ax_price.scatter(
+                np.asarray([t["timestamp"] for t in points], dtype="datetime64[ms]"),
+                [t["price"] for t in points],
+                marker=marker, color=color, s=30, label=label, zorder=3
+            )
+    ax_price.set_ylabel("Price (USD)")
+    if ax_price.collections:
+        ax_price.legend(loc="upper left")
+
+    idx = downsample(rsi, max_points)
+    ax_rsi.plot(timestamps[idx], rsi[idx], linewidth=0.8, color="tab:purple")
+    ax_rsi.axhline(rsi_buy_threshold, color="tab:green", linestyle="--", linewidth=0.8)
+    ax_rsi.axhline(rsi_sell_threshold, color="tab:red", linestyle="--", linewidth=0.8)
+    ax_rsi.set_ylim(0, 100)
+    ax_rsi.set_ylabel("RSI")
+
+    idx = downsample(equity, max_points)
+    ax_equity.plot(timestamps[idx], equity[idx], linewidth=1, color="tab:blue")
+    ax_equity.set_ylabel("Value (USDC)")
+
+    idx = downsample(drawdown, max_points)
+    ax_drawdown.fill_between(timestamps[idx], drawdown[idx], 0, color="tab:red", alpha=0.4)
+    ax_drawdown.set_ylabel("Drawdown (%)")
+
+    for ax in (ax_price, ax_rsi, ax_equity, ax_drawdown):
+        ax.grid(True)
+
+    final_profit = equity[-1] - (equity[0] if initial_capital is None else initial_capital)
+    fig.suptitle(f"{title} | Net profit: ${final_profit:.2f} | Max drawdown: {drawdown.min():.2f}%")
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
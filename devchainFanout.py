@@ -0,0 +1,72 @@
+import argparse
+import sys
+import time
+from eth_account import Account
+from walletExecutor import WalletExecutor
+
+# Well-known prefunded dev accounts of anvil (never use these keys on a real network)
+ANVIL_PRIVATE_KEYS = [
+    "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80",
+    "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d",
+    "0x5de4111afa1a4b94908f83103eb1f1706367c2e68ca870fc3fb9a804cdab365a",
+    "0x7c852118294e51e653712a81e05800f419141751be58f605c371e15141b007a6",
+    "0x47e179ec197488593b187f80a00eb0da91f1b9d0b13f8733639f19c30a34926a",
+    "0x8b3a350cf5c34c9194ca85829a2df0ec3153be0318b5e2d3348e872092edffba",
+    "0x92db14e403b83dfe3df233f83dfa3a0d7096f21ca9b0d6d6b8d88b2b4ec1564e",
+    "0x4bbbf85ce3377467afe5d46f804f221813b2bb87f24d81f60f1fcdbf7cbf4356",
+    "0xdbda1821b80551c9d65939329250298aa3472ba22feea921c0cf5d620ea67b97",
+    "0x2a871d0798f97d79848a013d4936a73bf4cc922c825d33c1cf7073dff6d409c6",
+]
+
+
+def main():
+    """
+    Checks that fanning one trade out to N wallets takes about as long as one trade.
+
+    Start a Base fork first, e.g.:
+        anvil --fork-url https://mainnet.base.org --block-time 2
+    then run:
+        python devchainFanout.py --wallets 8
+    The first anvil account makes one trade alone; the next N accounts make the same
+    trade concurrently through WalletExecutor. Exits with 1 if any trade fails or
+    the fan-out takes more than --max-ratio times the single trade.
+    """
+    parser = argparse.ArgumentParser(description="Multi-wallet fan-out check on a local dev chain")
+    parser.add_argument("--rpc-url", default="http://127.0.0.1:8545")
+    parser.add_argument("--wallets", type=int, default=8, help="Wallets in the fan-out (max 9)")
+    parser.add_argument("--amount", type=float, default=0.001, help="ETH swapped per wallet")
+    parser.add_argument("--token", default="USDC_BASE", help="Token bought with ETH")
+    parser.add_argument("--max-ratio", type=float, default=2.0)
+    args = parser.parse_args()
+
+    keys = ANVIL_PRIVATE_KEYS[:args.wallets + 1]
+    wallets = [(Account.from_key(key).address, key) for key in keys]
+    executor = WalletExecutor(wallets, rpc_url=args.rpc_url)
+
+    try:
+        start = time.time()
+        executor.submit(wallets[0][0], "WETH_BASE", args.token, args.amount).result()
+        single = time.time() - start
+
+        fanout_amounts = {address: args.amount for address, _ in wallets[1:]}
+        start = time.time()
+        results = executor.trade_all("WETH_BASE", args.token, fanout_amounts)
+        fanout = time.time() - start
+    finally:
+        executor.shutdown()
+
+    failed = [address for address, error in results.items() if error is not None]
+    ratio = fanout / single if single > 0 else float("inf")
+    print(f"\nSingle trade: {single:.2f}s | {len(fanout_amounts)} wallets: {fanout:.2f}s | ratio {ratio:.2f}")
+
+    if failed:
+        print(f"❌ {len(failed)} wallet trades failed.")
+        sys.exit(1)
+    if ratio > args.max_ratio:
+        print(f"❌ Fan-out took more than {args.max_ratio}x a single trade.")
+        sys.exit(1)
+    print("✅ Fan-out time is close to a single trade.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from advancedTradingBot import AdvancedTradingBot
 import sys
 
 class Front:
-    def __init__(self):
+    def __init__(self, profiler=None):
         print("=== Welcome to the Trading Bot CLI ===\n")
 
         wallet_address = input("1. Enter your wallet address: ").strip()
@@ -43,22 +43,28 @@ class Front:
                 profit_stop=profit_stop,
                 initial_balance_usdc=initial_balance,
                 wallet_address=wallet_address,
-                private_key=private_key
+                private_key=private_key,
+                profiler=profiler
             )
-            value = bot.get_usdc_balance()
 
-            if value < initial_balance:
-                print(f"❌ Insufficient USDC balance. Required: ${initial_balance:.2f}, found: ${value:.2f}")
-                print("Please top up your wallet and restart the bot.")
-                sys.exit(1)
+            resume = False
+            if bot.load_state() is not None:
+                resume = input("7. Saved state found. Resume from it? (y/n): ").strip().lower() == "y"
 
-            eth_balance = bot.trader.get_balance(wallet_address, token_symbol=None)
-            if eth_balance < 0.0005:
-                print(f"⚠️ Warning: ETH balance is very low (${eth_balance:.5f}). You may not be able to pay gas fees.")
+            problems = bot.precheck(resume=resume)
+            if problems:
+                for problem in problems:
+                    print(problem)
                 print("Please top up your wallet and restart the bot.")
                 sys.exit(1)
 
-            bot.run()
+            if profiler:
+                profiler.start()
+            try:
+                bot.run(resume=resume)
+            finally:
+                if profiler:
+                    profiler.stop()
             # If run() ends (breaks from loop), show final summary
             if bot.price_history:
                 bot.print_final_summary(bot.price_history[-1])
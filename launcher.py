@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+from advancedTradingBot import AdvancedTradingBot
+from priceClient import PriceClient
+from uniswapTrader import UniswapTrader, MarketCache, TokenNotFoundError, create_web3, ALCHEMY_URL, UNISWAP_ROUTER_ADDRESS
+
+
+def load_config(path):
+    """
+    Loads a fleet config file. Example:
+    {
+        "rpc_url": "https://...",            (optional)
+        "price_ttl": 60,                      (optional)
+        "bots": [
+            {
+                "coin_id": "degen-base",
+                "trader_coin": "DEGEN",       (optional if coin_id is in AdvancedTradingBot.trader_coins)
+                "wallet_address": "0x...",
+                "private_key_env": "BOT1_PRIVATE_KEY",   (or "private_key")
+                "initial_balance_usdc": 100,
+                "profit_take": 10,
+                "profit_stop": -10,
+                "check_interval": 3600,       (optional)
+                "resume": true                (optional, default true)
+            }
+        ]
+    }
+    """
+    with open(path) as f:
+        config = json.load(f)
+
+    if not config.get("bots"):
+        raise ValueError(f"No bots defined in {path}.")
+
+    for i, spec in enumerate(config["bots"]):
+        for field in ("coin_id", "wallet_address", "initial_balance_usdc", "profit_take", "profit_stop"):
+            if field not in spec:
+                raise ValueError(f"Bot {i} in {path} is missing '{field}'.")
+        if "private_key" not in spec:
+            env_name = spec.get("private_key_env")
+            if not env_name or not os.environ.get(env_name):
+                raise ValueError(f"Bot {i} in {path} needs 'private_key' or a set 'private_key_env'.")
+            spec["private_key"] = os.environ[env_name]
+    return config
+
+
+class FleetLauncher:
+    """
+    Starts and supervises many bots from a config file, without interactive prompts.
+
+    All bots share one RPC connection pool, one gas/quote cache and one price
+    client; bots on the same wallet share a UniswapTrader so their nonces stay
+    ordered. Bots that crash are restarted from their saved state.
+    """
+    restart_delay = 60
+    max_restarts = 5
+    supervise_interval = 5
+
+    def __init__(self, config):
+        self.config = config
+        self.specs = config["bots"]
+        self.bots = []
+        self.threads = {}
+        self.errors = {}
+        self.restarts = {}
+        self.timings = {}
+
+    def build(self):
+        """Creates the shared clients and one bot per spec."""
+        start = time.perf_counter()
+
+        self.web3 = create_web3(self.config.get("rpc_url", ALCHEMY_URL), pool_size=max(10, len(self.specs)))
+        self.cache = MarketCache()
+        self.price_client = PriceClient(
+            [spec["coin_id"] for spec in self.specs],
+            ttl=self.config.get("price_ttl", 60)
+        )
+        router_address = self.config.get("router_address", UNISWAP_ROUTER_ADDRESS)
+
+        traders = {}
+        router_contract = None
+        for index, spec in enumerate(self.specs):
+            wallet_address = Web3.to_checksum_address(spec["wallet_address"])
+            if wallet_address not in traders:
+                traders[wallet_address] = UniswapTrader(
+                    wallet_address=wallet_address,
+                    private_key=spec["private_key"],
+                    web3=self.web3,
+                    cache=self.cache,
+                    router_address=router_address,
+                    router_contract=router_contract,
+                )
+                router_contract = traders[wallet_address].contract
+
+            bot = AdvancedTradingBot(
+                coin_id=spec["coin_id"],
+                profit_take=spec["profit_take"],
+                profit_stop=spec["profit_stop"],
+                initial_balance_usdc=spec["initial_balance_usdc"],
+                wallet_address=wallet_address,
+                private_key=spec["private_key"],
+                trader_coin=spec.get("trader_coin"),
+                trader=traders[wallet_address],
+                price_client=self.price_client,
+            )
+            if "check_interval" in spec:
+                bot.check_interval = spec["check_interval"]
+            if not hasattr(bot, "trader_coin"):
+                raise ValueError(f"Bot {index}: unknown coin {spec['coin_id']}, set 'trader_coin' to its symbol in tokens.json.")
+            try:
+                bot.trader.get_token(bot.trader_coin)
+            except TokenNotFoundError as e:
+                raise ValueError(f"Bot {index}: {e}") from e
+            self.bots.append(bot)
+
+        self.timings["build"] = time.perf_counter() - start
+
+    def precheck(self):
+        """
+        Runs every bot's balance and gas checks concurrently; returns (index, spec, bot) for those that passed.
+        Bots starting fresh on the same wallet must be covered by its USDC balance together.
+        """
+        start = time.perf_counter()
+
+        resumes = [spec.get("resume", True) and bot.load_state() is not None for spec, bot in zip(self.specs, self.bots)]
+        required = {}
+        for bot, resume in zip(self.bots, resumes):
+            if not resume:
+                required[bot.trader.wallet_address] = required.get(bot.trader.wallet_address, 0) + bot.initial_capital
+
+        def check(item):
+            bot, resume = item
+            try:
+                return bot.precheck(resume=resume, required_usdc=required.get(bot.trader.wallet_address))
+            except Exception as e:
+                return [f"❌ Pre-check failed: {e}"]
+
+        with ThreadPoolExecutor(max_workers=min(32, len(self.bots))) as pool:
+            results = list(pool.map(check, zip(self.bots, resumes)))
+
+        ready = []
+        for index, (spec, bot, problems) in enumerate(zip(self.specs, self.bots, results)):
+            if problems:
+                print(f"Skipping {bot.coin_id} on {bot.wallet_address}:")
+                for problem in problems:
+                    print(f"   {problem}")
+            else:
+                ready.append((index, spec, bot))
+
+        self.timings["precheck"] = time.perf_counter() - start
+        return ready
+
+    def run_bot(self, index, bot, resume):
+        try:
+            bot.run(resume=resume, clear_log=False)
+        except Exception as e:
+            print(f"❌ Bot {bot.coin_id} on {bot.wallet_address} crashed: {e}")
+            self.errors[index] = e
+
+    def start_bot(self, index, bot, resume):
+        thread = threading.Thread(
+            target=self.run_bot, args=(index, bot, resume),
+            name=f"bot-{index}-{bot.coin_id}", daemon=True
+        )
+        self.threads[index] = (thread, bot)
+        thread.start()
+
+    def start(self):
+        """Builds, pre-checks and starts every bot. Returns the number of bots running."""
+        start = time.perf_counter()
+        self.build()
+        ready = self.precheck()
+
+        for index, spec, bot in ready:
+            self.start_bot(index, bot, spec.get("resume", True))
+
+        self.timings["total"] = time.perf_counter() - start
+        count = max(1, len(self.specs))
+        print(f"\n🚀 Started {len(ready)}/{len(self.specs)} bots in {self.timings['total']:.2f}s "
+              f"(build {self.timings['build']:.2f}s, pre-checks {self.timings['precheck']:.2f}s, "
+              f"{self.timings['total'] / count * 1000:.1f} ms per bot)\n")
+        return len(ready)
+
+    def supervise(self):
+        """Restarts crashed bots from their saved state until every bot has stopped."""
+        restart_at = {}
+        while any(thread.is_alive() for thread, _ in self.threads.values()) or restart_at:
+            time.sleep(self.supervise_interval)
+            for index, (thread, bot) in list(self.threads.items()):
+                if thread.is_alive() or index not in self.errors:
+                    continue
+                if index not in restart_at:
+                    if self.restarts.get(index, 0) >= self.max_restarts:
+                        continue
+                    restart_at[index] = time.time() + self.restart_delay
+                    print(f"🔁 Restarting bot {index} ({bot.coin_id}) in {self.restart_delay} seconds...")
+                elif time.time() >= restart_at[index]:
+                    del restart_at[index]
+                    del self.errors[index]
+                    self.restarts[index] = self.restarts.get(index, 0) + 1
+                    bot.running = True
+                    bot.stop_event.clear()
+                    self.start_bot(index, bot, resume=True)
+
+    def stop(self):
+        """
+        Stops every bot and waits for their threads, so in-flight trades finish
+        and each bot writes its final snapshot before the process exits.
+        """
+        for _, bot in self.threads.values():
+            bot.terminate()
+
+        print("⏳ Waiting for in-flight trades to finish (Ctrl-C again to force quit)...")
+        for thread, _ in self.threads.values():
+            thread.join()
+
+        for _, bot in self.threads.values():
+            if bot.price_history:
+                bot.print_final_summary(bot.price_history[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fleet of trading bots from a config file")
+    parser.add_argument("config", help="Path to the fleet JSON config")
+    args = parser.parse_args()
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Invalid config: {e}")
+        sys.exit(1)
+
+    launcher = FleetLauncher(config)
+    try:
+        started = launcher.start()
+    except ValueError as e:
+        print(f"Invalid config: {e}")
+        sys.exit(1)
+    if not started:
+        print("No bots passed the pre-checks. Exiting.")
+        sys.exit(1)
+
+    try:
+        launcher.supervise()
+    except KeyboardInterrupt:
+        print("\n🔴 Fleet manually interrupted.")
+        try:
+            launcher.stop()
+        except KeyboardInterrupt:
+            print("⚠️ Forced quit, trades in flight may be unfinished; they are resumed from the saved state.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
+import argparse
 from front import Front
+from profiler import RunProfiler
+
 if __name__ == "__main__":
-    Front()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Trading Bot CLI")
+    parser.add_argument("--profile", choices=["cprofile", "sampling"], help="Enable CPU profiling")
+    parser.add_argument("--profile-memory", action="store_true", help="Record tracemalloc snapshots")
+    parser.add_argument("--profile-dir", default="profiles", help="Directory for profile reports")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile or args.profile_memory:
+        profiler = RunProfiler("live", cpu=args.profile, memory=args.profile_memory, output_dir=args.profile_dir)
+
+    Front(profiler=profiler)
@@ -0,0 +1,61 @@
+import threading
+import time
+import requests
+
+
+class PriceClient:
+    """
+    CoinGecko price client shared by many bots.
+
+    Prices for every registered coin are fetched together in one /simple/price
+    request and cached for ttl seconds, so N bots polling at the same time cost
+    one HTTP request instead of N.
+    """
+    api_url = "https://api.coingecko.com/api/v3/simple/price"
+
+    def __init__(self, coin_ids=(), ttl=60):
+        self.coin_ids = set(coin_ids)
+        self.ttl = ttl
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.prices = {}
+        self.fetched_at = 0
+
+    def register(self, coin_id):
+        with self.lock:
+            if coin_id not in self.coin_ids:
+                self.coin_ids.add(coin_id)
+                self.fetched_at = 0  # next read must include the new coin
+
+    def get_price_data(self, coin_id):
+        """Returns {"current_price", "volume_24h"} for coin_id, or None on API error."""
+        self.register(coin_id)
+        with self.lock:
+            if time.time() - self.fetched_at >= self.ttl:
+                try:
+                    self.prices = self.fetch()
+                    self.fetched_at = time.time()
+                except Exception as e:
+                    print(f"Error fetching data: {e}")
+                    return None
+            data = self.prices.get(coin_id)
+
+        if not data or "usd" not in data:
+            return None
+        return {
+            "current_price": data["usd"],
+            "volume_24h": data.get("usd_24h_vol", 0)
+        }
+
+    def fetch(self):
+        response = self.session.get(
+            self.api_url,
+            params={
+                "ids": ",".join(sorted(self.coin_ids)),
+                "vs_currencies": "usd",
+                "include_24hr_vol": "true"
+            },
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,195 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Low-overhead CPU profiler that samples the stack of one thread at a fixed interval.
+    Writes stacks in the folded format read by flamegraph.pl and speedscope.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread_id = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.running = True
+        self.thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def _sample(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """
+    Opt-in profiling for backtest and live runs.
+
+    cpu can be None, "cprofile" (writes a .prof file for pstats/snakeviz) or
+    "sampling" (writes a .folded file for flamegraph tools). memory=True records
+    tracemalloc snapshots. Per-tick wall-clock phases are always recorded and
+    returned by summary().
+    """
+    def __init__(self, name, cpu=None, memory=False, output_dir="profiles", sample_interval=0.005):
+        if cpu not in (None, "cprofile", "sampling"):
+            raise ValueError(f"Unknown CPU profiler: {cpu}")
+
+        self.name = name
+        self.cpu = cpu
+        self.memory = memory
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+
+        self.cpu_profiler = None
+        self.ticks = []
+        self.current_tick = None
+        self.last_mark = None
+        self.start_time = None
+        self.end_time = None
+        self.memory_peak = None
+        self.reports = []
+
+    def report_path(self, suffix):
+        return os.path.join(self.output_dir, f"{self.name}{suffix}")
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.memory:
+            tracemalloc.start(25)
+        if self.cpu == "cprofile":
+            self.cpu_profiler = cProfile.Profile()
+            self.cpu_profiler.enable()
+        elif self.cpu == "sampling":
+            self.cpu_profiler = SamplingProfiler(self.sample_interval)
+            self.cpu_profiler.start()
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        """Stops profiling, writes the reports and returns the summary."""
+        self.tick_end()
+        self.end_time = time.perf_counter()
+
+        if self.cpu == "cprofile":
+            self.cpu_profiler.disable()
+            path = self.report_path(".prof")
+            self.cpu_profiler.dump_stats(path)
+            self.reports.append(path)
+        elif self.cpu == "sampling":
+            self.cpu_profiler.stop()
+            path = self.report_path(".folded")
+            self.cpu_profiler.write(path)
+            self.reports.append(path)
+
+        if self.memory:
+            self.snapshot("final")
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        path = self.report_path("_ticks.json")
+        with open(path, "w") as f:
+            json.dump(self.ticks, f)
+        self.reports.append(path)
+
+        for report in self.reports:
+            print(f"📊 Profile report written: {report}")
+        return self.summary()
+
+    def snapshot(self, label):
+        """Dumps a tracemalloc snapshot and a text report of the top allocations."""
+        if not self.memory:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        path = self.report_path(f"_{label}.tracemalloc")
+        snapshot.dump(path)
+        self.reports.append(path)
+
+        path = self.report_path(f"_{label}_memory.txt")
+        with open(path, "w") as f:
+            for stat in snapshot.statistics("lineno")[:25]:
+                f.write(f"{stat}\n")
+        self.reports.append(path)
+
+    def tick_start(self):
+        """Starts timing a new tick, closing the previous one if still open."""
+        self.tick_end()
+        self.current_tick = {}
+        self.last_mark = time.perf_counter()
+
+    def mark(self, phase):
+        """Records the time spent since the last mark (or tick start) under phase."""
+        if self.current_tick is None:
+            return
+        now = time.perf_counter()
+        self.current_tick[phase] = self.current_tick.get(phase, 0) + (now - self.last_mark)
+        self.last_mark = now
+
+    def tick_end(self):
+        if self.current_tick is None:
+            return
+        self.mark("other")
+        self.ticks.append(self.current_tick)
+        self.current_tick = None
+
+    def summary(self):
+        """Wall-clock breakdown per phase across all ticks (seconds)."""
+        phases = {}
+        for tick in self.ticks:
+            for phase, seconds in tick.items():
+                phases.setdefault(phase, []).append(seconds)
+
+        breakdown = {}
+        for phase, values in phases.items():
+            values.sort()
+            breakdown[phase] = {
+                "total": sum(values),
+                "mean": sum(values) / len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max": values[-1],
+            }
+
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return {
+            "ticks": len(self.ticks),
+            "wall_time": end_time - self.start_time if self.start_time is not None else 0,
+            "phases": breakdown,
+            "memory_peak_bytes": self.memory_peak,
+            "reports": list(self.reports),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n==== PROFILE ({summary['ticks']} ticks, {summary['wall_time']:.3f}s) ====")
+        for phase, stats in summary["phases"].items():
+            print(f"{phase:>12}: total {stats['total']:.4f}s | mean {stats['mean'] * 1000:.3f}ms | "
+                  f"p95 {stats['p95'] * 1000:.3f}ms | max {stats['max'] * 1000:.3f}ms")
+        if summary["memory_peak_bytes"] is not None:
+            print(f"Memory peak: {summary['memory_peak_bytes'] / 1024:.1f} KiB")
@@ -1,9 +1,12 @@
+import json
 import requests
 from advancedTradingBot import AdvancedTradingBot
 from datetime import datetime
-import matplotlib.pyplot as plt
-import time
-import json 
+import argparse
+import sys
+from profiler import RunProfiler
+from backtestCache import BacktestCache, code_version
+from backtestReport import render_report
 
 def fetch_historical_data(coin_id, days=5, interval='hourly'):
     """	If you use days=1, you get 5-minute intervals (good for high-frequency backtests).
@@ -31,16 +34,119 @@ class BacktestBot(AdvancedTradingBot):
     """
     Extends the AdvancedTradingBot with a run_backtest method
     that iterates over a list of historical price points.
+    Trades are kept in self.trades; they only go to a file if trade_log is set.
     """
-    def run_backtest(self, historical_prices):
+    def __init__(self, *args, trade_log=None, **kwargs):
+        """
+        :param trade_log: Optional file the trades of each backtest are written to (one JSON object per line)
+        """
+        super().__init__(*args, **kwargs)
+        self.trade_log = trade_log
+        self.trades = []
+        self.series = self.empty_series()
 
-        AdvancedTradingBot.clear_trade_log()
+    @staticmethod
+    def empty_series():
+        return {"timestamp": [], "price": [], "equity": [], "position": [], "rsi": []}
+
+    def run_backtest(self, historical_prices, cache=None):
+        """
+        Runs the strategy over [timestamp_ms, price] points and returns a summary dict.
+        With a BacktestCache, results for an already simulated series and
+        parameter set are loaded instead of recomputed. The trade log, if any,
+        is written the same way for both.
+        """
+        summary = self.run_or_load(historical_prices, cache)
+        if self.trade_log:
+            self.write_trade_log()
+        return summary
+
+    def run_or_load(self, historical_prices, cache):
+        if cache is None:
+            return self.simulate(historical_prices)
+
+        version = code_version(__file__, sys.modules[AdvancedTradingBot.__module__].__file__)
+        key = cache.make_key(historical_prices, self.backtest_params(), version)
+        result = cache.get(key)
+        if result is not None:
+            print(f"Loaded cached BACKTEST for {self.coin_id} ({key[:12]})")
+            self.restore_result(result, historical_prices)
+            return dict(result["summary"])
+
+        summary = self.simulate(historical_prices)
+        cached_summary = {k: v for k, v in summary.items() if k != "profile"}
+        cache.put(key, {
+            "summary": cached_summary,
+            "trades": self.trades,
+            "series": self.series,
+        })
+        return summary
+
+    def backtest_params(self):
+        """Every parameter that changes the result of a backtest."""
+        return {
+            "coin_id": self.coin_id,
+            "profit_take": self.profit_take,
+            "profit_stop": self.profit_stop,
+            "initial_capital": self.initial_capital,
+            "rsi_period": self.rsi_period,
+        }
+
+    def restore_result(self, result, historical_prices):
+        """Puts the bot in the state it would be in after simulating historical_prices."""
+        summary = result["summary"]
+        self.usdc_balance = summary["usdc_balance"]
+        self.coin_balance = summary["coin_balance"]
+        self.trades = result["trades"]
+        self.series = result["series"]
+
+        consumed = historical_prices[:len(self.series["timestamp"])]
+        self.price_history = [price for _, price in consumed[-(self.rsi_period + 1):]]
+        if consumed:
+            self.baseline_price = consumed[0][1]
+
+    def log_trade(self, action, amount, price):
+        self.trades.append({"timestamp": self.current_timestamp, "action": action, "amount": amount, "price": price})
+
+    def write_trade_log(self):
+        """Replaces trade_log with the trades of the last backtest."""
+        with open(self.trade_log, "w") as f:
+            for trade in self.trades:
+                f.write(json.dumps(trade) + "\n")
+
+    def record_tick(self, timestamp, current_price, rsi):
+        """Stores price, portfolio value, position and RSI at this data point."""
+        self.series["timestamp"].append(timestamp)
+        self.series["price"].append(current_price)
+        self.series["equity"].append(self.get_portfolio_value(current_price))
+        self.series["position"].append(self.coin_balance)
+        self.series["rsi"].append(rsi)
+
+    def simulate(self, historical_prices):
+        """
+        Runs the strategy over every data point and returns a summary dict.
+        Always starts from the initial capital, so reusing a bot gives the same
+        result as a fresh one (and as a cache hit).
+        """
+
+        self.usdc_balance = self.initial_capital
+        self.coin_balance = 0
+        self.holding = False
+        self.baseline_price = None
+        self.price_history = []
+
+        self.trades = []
+        self.series = self.empty_series()
         
         min_trade_value = 1.0  # Only buy/sell if trade is worth more than $1
 
         print(f"Starting BACKTEST for {self.coin_id} with {len(historical_prices)} data points...")
         
         for i, (timestamp, price) in enumerate(historical_prices):
+            if self.profiler:
+                self.profiler.tick_start()
+            self.current_timestamp = timestamp
+
             # Convert ms timestamp to a readable date 
             date_str = datetime.utcfromtimestamp(timestamp/1000).strftime('%Y-%m-%d %H:%M:%S')
             
@@ -77,6 +183,9 @@ class BacktestBot(AdvancedTradingBot):
 
             # Still compute percent_change but not necessarily use it
             percent_change = ((current_price - self.baseline_price) / self.baseline_price) * 100
+
+            if self.profiler:
+                self.profiler.mark("indicators")
             
             # Step 1: forced net profit check
             if self.coin_balance > 0:
@@ -86,6 +195,7 @@ class BacktestBot(AdvancedTradingBot):
                     self.usdc_balance += usdc_gained
                     self.log_trade("FULL_SELL_PROFIT", self.coin_balance, current_price)
                     self.coin_balance = 0
+                    self.record_tick(timestamp, current_price, rsi)
                     break
                 elif net_profit <= self.profit_stop:
                     print(f"Net profit <= {self.profit_stop:.2f} => SELL ALL")
@@ -93,6 +203,7 @@ class BacktestBot(AdvancedTradingBot):
                     self.usdc_balance += usdc_gained
                     self.log_trade("FULL_SELL_STOPLOSS", self.coin_balance, current_price)
                     self.coin_balance = 0
+                    self.record_tick(timestamp, current_price, rsi)
                     break
 
             # Step 2: partial RSI-based trades
@@ -134,6 +245,10 @@ class BacktestBot(AdvancedTradingBot):
                     print("No RSI sell condition.")
                 print(f"{self.coin_id.upper()} Balance: {self.coin_balance:.6f} (~${self.coin_balance * current_price:.2f}), USDC Balance: ${self.usdc_balance:.2f}")
 
+            self.record_tick(timestamp, current_price, rsi)
+            if self.profiler:
+                self.profiler.mark("trading")
+
         # After the loop, print final stats:
         final_value = self.get_portfolio_value(self.price_history[-1])
         final_profit = final_value - self.initial_capital
@@ -142,57 +257,43 @@ class BacktestBot(AdvancedTradingBot):
         print(f"Final Net Profit: ${final_profit:.2f}")
         print(f"Final USDC Balance: ${self.usdc_balance:.2f}, Final {self.coin_id.upper()} Balance:  {self.coin_balance:.6f} (~${self.coin_balance * current_price:.2f})")
 
+        summary = {
+            "final_value": final_value,
+            "final_profit": final_profit,
+            "usdc_balance": self.usdc_balance,
+            "coin_balance": self.coin_balance,
+        }
+        if self.profiler:
+            self.profiler.tick_end()
+            summary["profile"] = self.profiler.summary()
+        return summary
+
 
-    def plot(self):
-        initial_balance_usdc = 100.0
-        wallet = "0xDemoAddress"
-        trades_file = "trades.json"
-
-        try:
-            with open(trades_file, "r") as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            print("trades.json file not found.")
-            return
-
-        balance_usdc = initial_balance_usdc
-        coin_balance = 0.0
-        values = []
-        timestamps = []
-
-        for line in lines:
-            trade = json.loads(line.strip())
-            if trade["wallet"] != wallet:
-                continue
-
-            timestamp = datetime.utcfromtimestamp(trade["timestamp"])
-            price = trade["price"]
-            amount = trade["amount"]
-
-            if trade["action"] == "BUY":
-                cost = price * amount
-                coin_balance += amount
-                balance_usdc -= cost
-            elif trade["action"] == "SELL":
-                coin_balance -= amount
-                balance_usdc += price * amount
-
-            total_value = balance_usdc + coin_balance * price
-            timestamps.append(timestamp)
-            values.append(total_value)
-
-        plt.figure(figsize=(10, 5))
-        plt.plot(timestamps, values, marker='o', linestyle='-')
-        plt.title("Portfolio Value Over Time")
-        plt.xlabel("Time")
-        plt.ylabel("Total Value in USDC")
-        plt.grid(True)
-        plt.tight_layout()
-        plt.xticks(rotation=45)
-        plt.show()
+    def plot(self, path="backtest_report.png", max_points=2000):
+        """Renders the equity, drawdown and RSI signal report of the last backtest to an image."""
+        if not self.series["timestamp"]:
+            raise ValueError("No backtest to plot yet, run run_backtest first.")
+        render_report(
+            self.series, self.trades, path,
+            title=f"{self.coin_id.upper()} RSI backtest",
+            initial_capital=self.initial_capital,
+            max_points=max_points
+        )
+        print(f"📈 Report saved to {path}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="RSI strategy backtest")
+    parser.add_argument("--profile", choices=["cprofile", "sampling"], help="Enable CPU profiling")
+    parser.add_argument("--profile-memory", action="store_true", help="Record tracemalloc snapshots")
+    parser.add_argument("--profile-dir", default="profiles", help="Directory for profile reports")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute the backtest")
+    parser.add_argument("--trade-log", help="Also write the trades to this file (e.g. trades.json)")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile or args.profile_memory:
+        profiler = RunProfiler("backtest", cpu=args.profile, memory=args.profile_memory, output_dir=args.profile_dir)
 
     #https://api.coingecko.com/api/v3/coins/list -> for coin names
     #Reference coins -> ETH (ethereum), AERO (aerodrome-finance), Dege (degen-base)
@@ -209,12 +310,18 @@ def main():
         profit_take=10,   # e.g., +$10 net profit => sell all
         profit_stop=-10, # e.g., -$10 net => sell all
         initial_balance_usdc=100.0,
-        wallet_address="0xDemoAddress"
+        wallet_address="0xDemoAddress",
+        profiler=profiler,
+        trade_log=args.trade_log
     )
-    
-    bot.run_backtest(historical_data)
 
-    time.sleep(2)
+    if profiler:
+        profiler.start()
+    cache = None if args.no_cache else BacktestCache()
+    summary = bot.run_backtest(historical_data, cache=cache)
+    if profiler:
+        summary["profile"] = profiler.stop()
+        profiler.print_summary()
 
     bot.plot()
 
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from web3.exceptions import TransactionNotFound
+
+
+class FakeAccount:
+    def sign_transaction(self, tx, private_key):
+        return SimpleNamespace(raw_transaction=(tx['nonce'], tx['gasPrice']))
+
+
+class FakeEth:
+    """
+    Minimal stand-in for web3.eth. receipt_script is a list of actions consumed
+    one per get_transaction_receipt call: "pending", an exception instance to
+    raise, or "mined" to return a receipt for the polled hash.
+    """
+    def __init__(self, receipt_script=(), gas_price=100, nonce=7):
+        self.account = FakeAccount()
+        self.receipt_script = list(receipt_script)
+        self.sent = []
+        self.chain_nonce = nonce
+        self._gas_price = gas_price
+        self.gas_price_error = None
+        self.contracts = []
+        # What the node reports about sent transactions: counted in the pending nonce / found by hash
+        self.counts_sent = True
+        self.knows_sent = True
+
+    @property
+    def gas_price(self):
+        if self.gas_price_error is not None:
+            raise self.gas_price_error
+        return self._gas_price
+
+    def contract(self, address=None, abi=None):
+        contract = SimpleNamespace(address=address, functions=None)
+        self.contracts.append(contract)
+        return contract
+
+    def get_transaction_count(self, address, block_identifier="latest"):
+        if not self.counts_sent:
+            return self.chain_nonce
+        return self.chain_nonce + len({nonce for nonce, _ in self.sent})
+
+    def get_transaction(self, tx_hash):
+        if not self.knows_sent:
+            raise TransactionNotFound(f"{tx_hash!r} not found")
+        return SimpleNamespace(hash=tx_hash)
+
+    def estimate_gas(self, tx):
+        return 50000
+
+    def send_raw_transaction(self, raw):
+        self.sent.append(raw)
+        return f"hash-{len(self.sent)}".encode()
+
+    def get_transaction_receipt(self, tx_hash):
+        action = self.receipt_script.pop(0) if self.receipt_script else "pending"
+        if isinstance(action, Exception):
+            raise action
+        if action == "mined":
+            return SimpleNamespace(status=1, blockNumber=1, transactionHash=tx_hash)
+        raise TransactionNotFound(f"{tx_hash!r} not found")
+
+
+class FakeWeb3:
+    def __init__(self, eth):
+        self.eth = eth
+
+    def to_hex(self, value):
+        return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class FakeClock:
+    """Replaces the time module: sleep() advances time() and perf_counter() instantly."""
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.001)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 resets a burst of connections
+
+
+class FakeRpcServer:
+    """
+    Local JSON-RPC node over HTTP that answers single and batched requests
+    after latency seconds, and records the most requests served at once.
+    Every wallet holds 1 ETH, 100 units of any token (6 decimals) and nonce 7.
+    """
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.server = Server(("127.0.0.1", 0), self.handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def result(self, method, params):
+        if method == "eth_getBalance":
+            return hex(10 ** 18)
+        if method == "eth_call":
+            return "0x" + hex(100 * 10 ** 6)[2:].rjust(64, "0")
+        if method == "eth_getTransactionCount":
+            return hex(7)
+        if method == "eth_chainId":
+            return hex(8453)
+        if method == "eth_getTransactionReceipt":
+            return None
+        return "fake-node"
+
+    def handler(self):
+        rpc = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with rpc.lock:
+                    rpc.in_flight += 1
+                    rpc.max_in_flight = max(rpc.max_in_flight, rpc.in_flight)
+                try:
+                    time.sleep(rpc.latency)
+                    requests = body if isinstance(body, list) else [body]
+                    responses = [
+                        {"jsonrpc": "2.0", "id": request["id"],
+                         "result": rpc.result(request["method"], request["params"])}
+                        for request in requests
+                    ]
+                finally:
+                    with rpc.lock:
+                        rpc.in_flight -= 1
+                data = json.dumps(responses if isinstance(body, list) else responses[0]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+from types import SimpleNamespace
+from advancedTradingBot import AdvancedTradingBot
+from conftest import REPO_DIR
+from fakes import FakeRpcServer
+from uniswapTrader import UniswapTrader, create_web3
+
+
+def make_bot(monkeypatch, tmp_path, wallet_address="0x0000000000000000000000000000000000000001"):
+    monkeypatch.chdir(tmp_path)
+    return AdvancedTradingBot(
+        coin_id="degen-base",
+        profit_take=10,
+        profit_stop=-10,
+        initial_balance_usdc=100.0,
+        wallet_address=wallet_address,
+    )
+
+
+def test_concurrent_save_state_keeps_a_valid_snapshot(monkeypatch, tmp_path):
+    bot = make_bot(monkeypatch, tmp_path)
+    bot.trader = SimpleNamespace(get_pending_hashes=lambda owner=None: {7: ["0xabc"]}, active_trade=None)
+    errors = []
+
+    def save_many():
+        try:
+            for _ in range(50):
+                bot.save_state()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with open(bot.state_file) as f:
+        assert json.load(f)["pending_transactions"] == {"7": ["0xabc"]}
+    assert [p.name for p in (tmp_path / "state").iterdir()] == [os.path.basename(bot.state_file)]
+
+
+def test_state_file_uses_checksummed_address(monkeypatch, tmp_path):
+    lower = make_bot(monkeypatch, tmp_path, "0x70997970c51812dc3a010c7d01b50e0d17dc79c8")
+    checksummed = make_bot(monkeypatch, tmp_path, "0x70997970C51812dc3A010C7d01b50e0d17dc79C8")
+    assert lower.state_file == checksummed.state_file
+
+
+class FakeTrader:
+    trade_timeout = 600
+
+    def __init__(self, known_hashes=()):
+        self.active_trade = None
+        self.finished = []
+        self.pending_transactions = {}
+        self.known_hashes = set(known_hashes)
+
+    def get_pending_hashes(self, owner=None):
+        return dict(self.pending_transactions)
+
+    def finish_trade(self, active_trade):
+        self.finished.append(active_trade)
+
+    def get_account_snapshot(self, address, token_symbols):
+        return {"USDC_BASE": 100.0, "DEGEN": 0.0}, 5
+
+    def is_known(self, tx_hashes):
+        return bool(self.known_hashes.intersection(tx_hashes))
+
+    def wait_for_any_receipt(self, tx_hashes, wait_until):
+        raise AssertionError("a dropped transaction must not be awaited")
+
+    def forget_transaction(self, nonce):
+        self.pending_transactions.pop(nonce, None)
+
+    def clear_active_trade(self, owner):
+        if self.active_trade is not None and self.active_trade["owner"] == owner:
+            self.active_trade = None
+
+
+def interrupted_trade(bot, completed_leg):
+    return {
+        "owner": bot.state_file, "input": "USDC_BASE", "output": "DEGEN", "amount": 20_000_000,
+        "slippage": 1, "completed_leg": completed_leg, "eth_amount": 10**15 if completed_leg else None,
+    }
+
+
+def test_active_trade_is_saved_only_by_its_owner(monkeypatch, tmp_path):
+    bot = make_bot(monkeypatch, tmp_path)
+    other = make_bot(monkeypatch, tmp_path, "0x0000000000000000000000000000000000000002")
+    bot.trader = other.trader = FakeTrader()
+    bot.trader.active_trade = interrupted_trade(bot, 1)
+
+    bot.save_state()
+    other.save_state()
+
+    assert bot.load_state()["active_trade"]["completed_leg"] == 1
+    assert other.load_state()["active_trade"] is None
+
+
+def test_resume_finishes_second_leg_only_when_not_sent(monkeypatch, tmp_path):
+    bot = make_bot(monkeypatch, tmp_path)
+    bot.trader = FakeTrader()
+
+    assert bot.resume_trade(interrupted_trade(bot, 1), mined=False, still_pending=False)
+    assert bot.trader.finished[0]["eth_amount"] == 10**15
+
+    assert not bot.resume_trade(interrupted_trade(bot, 1), mined=True, still_pending=False)
+    assert not bot.resume_trade(interrupted_trade(bot, 1), mined=False, still_pending=True)
+    assert not bot.resume_trade(interrupted_trade(bot, 0), mined=True, still_pending=False)
+    assert len(bot.trader.finished) == 1
+
+
+def test_reconcile_does_not_disturb_receipt_polling(monkeypatch, tmp_path):
+    with FakeRpcServer(latency=0.01) as rpc:
+        monkeypatch.chdir(REPO_DIR)
+        trader = UniswapTrader("0x0000000000000000000000000000000000000001", "0x01", web3=create_web3(rpc.url))
+        bot = make_bot(monkeypatch, tmp_path)
+        bot.trader = trader
+        receipts = []
+        done = threading.Event()
+
+        def poll_receipt():
+            # Another bot on the same trader waiting for its swap to be mined
+            while not done.is_set():
+                receipts.append(trader.wait_for_any_receipt(["0x" + "ab" * 32], 0))
+
+        poller = threading.Thread(target=poll_receipt)
+        poller.start()
+        try:
+            for _ in range(20):
+                bot.reconcile_state({})
+        finally:
+            done.set()
+            poller.join()
+
+    assert receipts and set(receipts) == {None}
+    assert bot.usdc_balance == 100
+
+
+def read_trade_log(tmp_path):
+    with open(tmp_path / "trades.json") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resumed_full_sell_is_applied_to_the_bot(monkeypatch, tmp_path):
+    bot = make_bot(monkeypatch, tmp_path)
+    bot.trader = FakeTrader()
+    bot.usdc_balance, bot.coin_balance = 0.0, 2.0
+    active_trade = dict(interrupted_trade(bot, 1), action={"name": "FULL_SELL_PROFIT", "amount": 2.0, "price": 10.0})
+
+    assert bot.resume_trade(active_trade, mined=False, still_pending=False)
+
+    assert bot.usdc_balance == 20.0
+    assert bot.coin_balance == 0
+    assert not bot.running
+    assert [trade["action"] for trade in read_trade_log(tmp_path)] == ["FULL_SELL_PROFIT"]
+
+
+def test_resumed_buy_is_logged_without_moving_balances_again(monkeypatch, tmp_path):
+    bot = make_bot(monkeypatch, tmp_path)
+    bot.trader = FakeTrader()
+    bot.usdc_balance, bot.coin_balance = 80.0, 2.0
+    active_trade = dict(interrupted_trade(bot, 1), action={"name": "BUY", "amount": 2.0, "price": 10.0})
+
+    assert not bot.resume_trade(active_trade, mined=True, still_pending=False)
+
+    assert (bot.usdc_balance, bot.coin_balance) == (80.0, 2.0)
+    assert bot.running
+    assert [trade["action"] for trade in read_trade_log(tmp_path)] == ["BUY"]
+
+
+def test_reconcile_skips_dropped_transactions_and_clears_them(monkeypatch, tmp_path):
+    bot = make_bot(monkeypatch, tmp_path)
+    bot.trader = FakeTrader()
+    bot.trader.pending_transactions = {4: ["0xmined"], 9: ["0xdropped"]}
+    bot.trader.active_trade = interrupted_trade(bot, 0)
+
+    bot.reconcile_state({"4": ["0xmined"], "9": ["0xdropped"]}, interrupted_trade(bot, 0))
+
+    assert bot.trader.pending_transactions == {}
+    assert bot.trader.active_trade is None
+    assert bot.load_state()["pending_transactions"] == {}
+    assert bot.load_state()["active_trade"] is None
@@ -0,0 +1,51 @@
+import math
+import multiprocessing
+import os
+from backtestCache import BacktestCache
+from simulation import BacktestBot
+
+PRICES = [[1700000000000 + i * 3600000, 100 + 10 * math.sin(i / 7)] for i in range(300)]
+
+
+def make_bot():
+    return BacktestBot(
+        coin_id="bitcoin",
+        profit_take=1000,
+        profit_stop=-1000,
+        initial_balance_usdc=100.0,
+        wallet_address="0xDemoAddress",
+    )
+
+
+def put_same_key(cache_dir):
+    cache = BacktestCache(cache_dir, max_bytes=10_000)
+    for i in range(50):
+        cache.put("same", {"summary": {"i": i}, "padding": "x" * 500})
+        cache.put(f"key-{os.getpid()}-{i}", {"padding": "x" * 500})
+
+
+def test_concurrent_processes_share_the_cache(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    workers = [multiprocessing.Process(target=put_same_key, args=(cache_dir,)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
+    assert sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir)) <= 10_000
+
+
+def test_reused_bot_matches_cache_hit(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    cache = BacktestCache(str(tmp_path / "cache"))
+    bot = make_bot()
+
+    uncached = bot.run_backtest(PRICES)
+    first = bot.run_backtest(PRICES, cache=cache)
+    hit = bot.run_backtest(PRICES, cache=cache)
+    again = bot.run_backtest(PRICES)
+
+    assert uncached == first == hit == again
+    assert len(bot.series["equity"]) == len(PRICES)
@@ -0,0 +1,60 @@
+import warnings
+import numpy as np
+import pytest
+from backtestReport import downsample, render_report
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def make_series(n=500):
+    timestamps = [1700000000000 + i * 3600000 for i in range(n)]
+    price = [100 + 10 * np.sin(i / 20) for i in range(n)]
+    return {
+        "timestamp": timestamps,
+        "price": price,
+        "equity": [100 + p / 10 for p in price],
+        "position": [0.0] * n,
+        "rsi": [None] * 14 + [50.0] * (n - 14),
+    }
+
+
+def test_downsample_keeps_extremes():
+    values = np.random.default_rng(0).normal(size=10_000)
+    values[537], values[8123] = 50.0, -50.0
+
+    idx = downsample(values, 100)
+
+    assert len(idx) <= 102
+    assert {0, 537, 8123, 9_999} <= set(idx.tolist())
+    assert values[idx].max() == values.max()
+    assert values[idx].min() == values.min()
+
+
+def test_downsample_short_and_missing_values():
+    assert downsample(np.arange(10.0), 100).tolist() == list(range(10))
+    assert len(downsample(np.full(1000, np.nan), 100)) == 100
+
+    rsi = np.concatenate([np.full(14, np.nan), np.linspace(0, 100, 986)])
+    idx = downsample(rsi, 100)
+    assert 999 in idx and np.nanmax(rsi[idx]) == 100
+
+
+@pytest.mark.parametrize("trades", [
+    [],
+    [{"timestamp": 1700000000000 + 20 * 3600000, "action": "BUY", "price": 101.0},
+     {"timestamp": 1700000000000 + 90 * 3600000, "action": "FULL_SELL_PROFIT", "price": 105.0}],
+])
+def test_render_report_headless(tmp_path, trades):
+    path = tmp_path / "report.png"
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", UserWarning)  # e.g. "No artists with labels found"
+        render_report(make_series(), trades, str(path), initial_capital=100.0, max_points=50)
+
+    assert path.read_bytes().startswith(PNG_SIGNATURE)
+
+
+def test_render_report_rejects_empty_series(tmp_path):
+    empty = {"timestamp": [], "price": [], "equity": [], "position": [], "rsi": []}
+    with pytest.raises(ValueError):
+        render_report(empty, [], str(tmp_path / "report.png"))
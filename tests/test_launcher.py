@@ -0,0 +1,126 @@
+import json
+import sys
+import threading
+import time
+import pytest
+import launcher
+from conftest import REPO_DIR
+from fakes import FakeEth, FakeRpcServer, FakeWeb3
+from launcher import FleetLauncher
+
+
+def fleet_config(count):
+    return {"bots": [
+        {
+            "coin_id": "degen-base",
+            "wallet_address": f"0x{index + 1:040x}",
+            "private_key": "0x01",
+            "initial_balance_usdc": 100,
+            "profit_take": 10,
+            "profit_stop": -10,
+        }
+        for index in range(count)
+    ]}
+
+
+def make_launcher(monkeypatch, count):
+    monkeypatch.chdir(REPO_DIR)
+    eth = FakeEth()
+    monkeypatch.setattr(launcher, "create_web3", lambda rpc_url, pool_size: FakeWeb3(eth))
+    return FleetLauncher(fleet_config(count)), eth
+
+
+def test_build_shares_router_contract_and_token_files(monkeypatch):
+    fleet, eth = make_launcher(monkeypatch, 50)
+    fleet.build()
+
+    traders = [bot.trader for bot in fleet.bots]
+    assert len(fleet.bots) == 50
+    assert len(eth.contracts) == 1
+    assert all(trader.contract is eth.contracts[0] for trader in traders)
+    assert all(trader.tokens is traders[0].tokens for trader in traders)
+    assert all(trader.uniswap_abi is traders[0].uniswap_abi for trader in traders)
+
+
+def test_concurrent_prechecks_share_one_connection(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+    latency = 0.05
+    with FakeRpcServer(latency=latency) as rpc:
+        fleet = FleetLauncher(dict(fleet_config(32), rpc_url=rpc.url))
+        fleet.build()
+        nonces = []
+        done = threading.Event()
+
+        def poll_nonce():
+            # A trade polling the same connection while the pre-checks run
+            while not done.is_set():
+                nonces.append(fleet.web3.eth.get_transaction_count(fleet.bots[0].wallet_address, "pending"))
+
+        poller = threading.Thread(target=poll_nonce)
+        poller.start()
+        try:
+            ready = fleet.precheck()
+        finally:
+            done.set()
+            poller.join()
+
+    assert len(ready) == 32
+    assert nonces and set(nonces) == {7}
+    assert rpc.max_in_flight > 1
+    # 32 snapshots in parallel cost a few round trips, not 32
+    assert fleet.timings["precheck"] < latency * 8
+
+
+def test_stop_waits_for_trade_in_flight(monkeypatch):
+    fleet, _ = make_launcher(monkeypatch, 2)
+    fleet.build()
+    started = threading.Event()
+    finished = []
+
+    def run(self, resume=False, clear_log=True):
+        with self.trader.trade_lock:
+            started.set()
+            time.sleep(0.2)  # both legs of a swap
+            finished.append(self.wallet_address)
+        self.stop_event.wait(3600)
+
+    monkeypatch.setattr(launcher.AdvancedTradingBot, "run", run)
+    for index, bot in enumerate(fleet.bots):
+        fleet.start_bot(index, bot, resume=False)
+    started.wait()
+
+    start = time.perf_counter()
+    fleet.stop()
+
+    assert len(finished) == 2
+    assert not any(thread.is_alive() for thread, _ in fleet.threads.values())
+    # stop_event ends the hour-long wait between ticks right away
+    assert time.perf_counter() - start < 5
+
+
+def test_bots_sharing_a_wallet_need_its_balance_together(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+    config = fleet_config(3)
+    config["bots"][1]["wallet_address"] = config["bots"][0]["wallet_address"]
+    with FakeRpcServer() as rpc:
+        fleet = FleetLauncher(dict(config, rpc_url=rpc.url))
+        fleet.build()
+        ready = fleet.precheck()
+
+    # Every wallet holds 100 USDC: two 100 USDC bots cannot both start on one
+    assert [index for index, _, _ in ready] == [2]
+
+
+def test_unknown_token_is_reported_as_config_error(monkeypatch, tmp_path, capsys):
+    config = fleet_config(1)
+    config["bots"][0]["trader_coin"] = "NOT_A_TOKEN"
+    config_file = tmp_path / "fleet.json"
+    config_file.write_text(json.dumps(config))
+    make_launcher(monkeypatch, 1)  # chdir and offline web3
+    monkeypatch.setattr(sys, "argv", ["launcher.py", str(config_file)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        launcher.main()
+
+    assert exit_info.value.code == 1
+    assert "Invalid config: Bot 0: Token NOT_A_TOKEN not found" in capsys.readouterr().out
@@ -0,0 +1,78 @@
+import json
+import pytest
+import profiler
+from fakes import FakeClock
+from profiler import RunProfiler
+
+
+def test_phase_totals_across_ticks(monkeypatch):
+    clock = FakeClock(now=0.0)
+    monkeypatch.setattr(profiler, "time", clock)
+    run = RunProfiler("backtest")
+
+    run.start()
+    run.tick_start()
+    clock.sleep(1.0)
+    run.mark("fetch_price")
+    clock.sleep(2.0)
+    run.mark("trading")
+    clock.sleep(0.5)
+    run.tick_end()
+
+    run.tick_start()
+    clock.sleep(3.0)
+    run.mark("fetch_price")
+    run.tick_start()  # an open tick is closed by the next one
+    run.mark("fetch_price")
+    run.tick_end()
+    clock.sleep(1.5)
+    run.mark("ignored")  # no tick open
+
+    summary = run.summary()
+    phases = summary["phases"]
+    assert summary["ticks"] == 3
+    assert summary["wall_time"] == 8.0
+    assert phases["fetch_price"]["total"] == 4.0
+    assert phases["fetch_price"]["max"] == 3.0
+    assert phases["fetch_price"]["p50"] == 1.0
+    assert phases["trading"] == {"total": 2.0, "mean": 2.0, "p50": 2.0, "p95": 2.0, "max": 2.0}
+    assert phases["other"]["total"] == 0.5
+    assert "ignored" not in phases
+
+
+def test_cprofile_and_memory_reports_are_written(tmp_path):
+    run = RunProfiler("backtest", cpu="cprofile", memory=True, output_dir=str(tmp_path))
+    run.start()
+    run.tick_start()
+    sum(i * i for i in range(10000))
+    run.mark("indicators")
+
+    summary = run.stop()
+
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names == ["backtest.prof", "backtest_final.tracemalloc", "backtest_final_memory.txt", "backtest_ticks.json"]
+    assert sorted(summary["reports"]) == sorted(str(tmp_path / name) for name in names)
+    assert summary["memory_peak_bytes"] > 0
+    with open(tmp_path / "backtest_ticks.json") as f:
+        assert list(json.load(f)[0]) == ["indicators", "other"]
+
+
+def test_sampling_report_uses_folded_stacks(tmp_path):
+    run = RunProfiler("live", cpu="sampling", output_dir=str(tmp_path), sample_interval=0.001)
+    run.start()
+    total = 0
+    while run.cpu_profiler.stacks.total() < 5:
+        total += sum(range(1000))
+    run.stop()
+
+    lines = (tmp_path / "live.folded").read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert "test_profiler.py:test_sampling_report_uses_folded_stacks" in stack
+        assert int(count) > 0
+
+
+def test_unknown_cpu_profiler_is_rejected():
+    with pytest.raises(ValueError):
+        RunProfiler("backtest", cpu="perf")
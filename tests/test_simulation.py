@@ -0,0 +1,38 @@
+import json
+import pytest
+from backtestCache import BacktestCache
+from simulation import BacktestBot
+from test_backtestCache import PRICES, make_bot
+
+
+def test_backtest_keeps_trades_in_memory_only(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    bot = make_bot()
+
+    bot.run_backtest(PRICES)
+
+    assert bot.trades
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_trade_log_is_the_same_for_cache_hit_and_miss(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    cache = BacktestCache(str(tmp_path / "cache"))
+    trade_log = tmp_path / "backtest_trades.json"
+    bot = BacktestBot(
+        coin_id="bitcoin", profit_take=1000, profit_stop=-1000,
+        initial_balance_usdc=100.0, wallet_address="0xDemoAddress", trade_log=str(trade_log),
+    )
+
+    bot.run_backtest(PRICES, cache=cache)
+    miss = trade_log.read_text()
+    bot.run_backtest(PRICES, cache=cache)
+    hit = trade_log.read_text()
+
+    assert miss == hit
+    assert [json.loads(line) for line in hit.splitlines()] == bot.trades
+
+
+def test_plot_before_backtest_is_a_clear_error(tmp_path):
+    with pytest.raises(ValueError, match="No backtest to plot"):
+        make_bot().plot(str(tmp_path / "report.png"))
@@ -0,0 +1,231 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+import uniswapTrader
+from conftest import REPO_DIR
+from fakes import FakeClock, FakeEth, FakeWeb3
+from uniswapTrader import MarketCache, UniswapTrader, StuckTransactionError, TokenNotFoundError, is_fast_fail
+
+
+def make_trader(monkeypatch, eth):
+    monkeypatch.chdir(REPO_DIR)
+    monkeypatch.setattr(uniswapTrader, "time", FakeClock())
+    trader = UniswapTrader(
+        wallet_address="0x0000000000000000000000000000000000000001",
+        private_key="0x01",
+        web3=FakeWeb3(eth),
+    )
+    trader.poll_interval = 1
+    trader.stuck_timeout = 3
+    return trader
+
+
+def swap(trader, deadline=None):
+    """Builds and sends a swap the way buy_token does."""
+    tx = {'nonce': trader.next_nonce(), 'gasPrice': trader.gas_price()}
+    return trader.send_transaction(tx, deadline=deadline)
+
+
+def test_polling_error_does_not_resend_on_new_nonce(monkeypatch):
+    eth = FakeEth(["pending", ConnectionError("connection reset"), "pending", "mined"])
+    trader = make_trader(monkeypatch, eth)
+
+    receipt = trader.retry_until_success(swap, trader)
+
+    assert receipt.status == 1
+    assert {nonce for nonce, _ in eth.sent} == {7}
+    assert trader.pending_transactions == {}
+
+
+def test_stuck_transaction_is_replaced_with_same_nonce(monkeypatch):
+    eth = FakeEth(["pending"] * 4 + ["mined"])
+    trader = make_trader(monkeypatch, eth)
+
+    receipt = swap(trader)
+
+    nonces = {nonce for nonce, _ in eth.sent}
+    gas_prices = [gas_price for _, gas_price in eth.sent]
+    assert receipt.status == 1
+    assert len(eth.sent) == 2
+    assert nonces == {7}
+    assert gas_prices[1] > gas_prices[0] * trader.gas_bump
+    assert trader.pending_transactions == {}
+
+
+def test_gas_price_error_during_bump_keeps_waiting(monkeypatch):
+    eth = FakeEth(["pending"] * 4 + ["mined"])
+    trader = make_trader(monkeypatch, eth)
+    tx = {'nonce': trader.next_nonce(), 'gasPrice': trader.gas_price()}
+    eth.gas_price_error = TimeoutError("rpc timeout")
+
+    receipt = trader.send_transaction(tx)
+
+    assert receipt.status == 1
+    assert len(eth.sent) == 2
+    assert {nonce for nonce, _ in eth.sent} == {7}
+
+
+def test_deadline_with_pending_transaction_is_not_retried(monkeypatch):
+    eth = FakeEth(["pending"] * 1000)
+    trader = make_trader(monkeypatch, eth)
+    calls = []
+
+    def pending_swap(deadline=None):
+        calls.append(deadline)
+        return swap(trader, deadline=deadline)
+
+    with pytest.raises(StuckTransactionError) as error:
+        trader.retry_until_success(pending_swap, deadline=0)
+
+    assert len(calls) == 1
+    assert error.value.tx_hashes == ["hash-1"]
+    assert 7 in trader.pending_transactions
+
+
+def test_fast_fail_classification():
+    try:
+        try:
+            raise TokenNotFoundError("Token FOO not found in the token file.")
+        except TokenNotFoundError as e:
+            raise Exception(f"Error buying token: {e}") from e
+    except Exception as wrapped:
+        assert is_fast_fail(wrapped)
+
+    assert is_fast_fail(Exception("insufficient funds for gas * price + value"))
+    assert is_fast_fail(StuckTransactionError("pending", []))
+    assert not is_fast_fail(ConnectionError("connection reset"))
+    assert not is_fast_fail(Exception("execution reverted: UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT"))
+
+
+def test_fast_fail_error_is_not_retried(monkeypatch):
+    trader = make_trader(monkeypatch, FakeEth())
+    calls = []
+
+    def unknown_token(deadline=None):
+        calls.append(deadline)
+        trader.get_token("NOT_A_TOKEN")
+
+    with pytest.raises(TokenNotFoundError):
+        trader.retry_until_success(unknown_token)
+    assert len(calls) == 1
+
+
+def test_market_cache_loads_each_key_once_under_concurrency():
+    cache = MarketCache(ttl=60)
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    def read():
+        barrier.wait()
+        results.append(cache.get("gas_price", loader))
+
+    results = []
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+
+
+def test_market_cache_invalidate_and_evict():
+    cache = MarketCache(ttl=60, max_entries=3)
+    for amount in range(10):
+        cache.get(("amount_out", amount), lambda: amount)
+    assert len(cache.entries) == 3
+
+    cache.invalidate(("amount_out", 9))
+    assert cache.get(("amount_out", 9), lambda: "fresh") == "fresh"
+
+
+def test_failed_swap_invalidates_its_quote(monkeypatch):
+    trader = make_trader(monkeypatch, FakeEth())
+    path = [trader.get_token("WETH_BASE")['address'], trader.get_token("DEGEN")['address']]
+    trader.cache.get(("amount_out", 100, tuple(path)), lambda: 99)
+
+    # The fake router cannot build the swap, so buy_token fails after quoting
+    with pytest.raises(Exception):
+        trader.buy_token(100, "DEGEN")
+
+    assert ("amount_out", 100, tuple(path)) not in trader.cache.entries
+
+
+def test_failed_leg_clears_active_trade(monkeypatch):
+    trader = make_trader(monkeypatch, FakeEth())
+
+    # The fake router cannot quote, so every attempt of the ETH → DEGEN leg fails
+    with pytest.raises(Exception):
+        trader.trade("WETH_BASE", "DEGEN", 0.001, owner="bot-a")
+
+    assert trader.active_trade is None
+
+
+def test_stuck_transaction_stays_with_its_owner(monkeypatch):
+    trader = make_trader(monkeypatch, FakeEth(["pending"] * 1000))
+    trader.active_trade = {"owner": "bot-a"}
+
+    with pytest.raises(StuckTransactionError):
+        swap(trader, deadline=0)
+    trader.abandon_trade()
+
+    assert trader.get_pending_hashes(owner="bot-a") == {7: ["hash-1"]}
+    assert trader.get_pending_hashes(owner="bot-b") == {}
+    # Kept until reconcile_state settles the pending nonce
+    assert trader.active_trade == {"owner": "bot-a"}
+
+    trader.forget_transaction(7)
+    trader.clear_active_trade("bot-a")
+    assert trader.get_pending_hashes() == {}
+    assert trader.active_trade is None
+
+
+def test_next_nonce_waits_for_a_lagging_node(monkeypatch):
+    eth = FakeEth(["pending"] * 1000)
+    trader = make_trader(monkeypatch, eth)
+    with pytest.raises(StuckTransactionError):
+        swap(trader, deadline=0)
+
+    # The node still has nonce 7 but its pending count lags behind
+    eth.counts_sent = False
+    assert trader.next_nonce() == 8
+    assert 7 in trader.pending_transactions
+
+
+def test_next_nonce_resyncs_after_a_dropped_transaction(monkeypatch):
+    eth = FakeEth(["pending"] * 1000)
+    trader = make_trader(monkeypatch, eth)
+    with pytest.raises(StuckTransactionError):
+        swap(trader, deadline=0)
+
+    # Nonce 7 fell out of the mempool: reuse it instead of leaving a gap
+    eth.counts_sent = eth.knows_sent = False
+    assert trader.next_nonce() == 7
+    assert trader.pending_transactions == {}
+    assert trader.nonce == 7
+
+
+def test_stuck_approval_stops_the_sell(monkeypatch):
+    eth = FakeEth(["pending"] * 1000)
+    trader = make_trader(monkeypatch, eth)
+    quotes = []
+    token_contract = SimpleNamespace(functions=SimpleNamespace(
+        allowance=lambda owner, spender: SimpleNamespace(call=lambda: 0),
+        approve=lambda spender, amount: SimpleNamespace(build_transaction=dict),
+    ))
+    monkeypatch.setattr(eth, "contract", lambda address=None, abi=None: token_contract)
+    monkeypatch.setattr(trader, "get_amount_out", lambda amount_in, path: quotes.append(path))
+
+    with pytest.raises(Exception) as error:
+        trader.retry_until_success(trader.sell_token, 100, "DEGEN", deadline=0)
+
+    assert isinstance(error.value.__cause__, StuckTransactionError)
+    assert len(eth.sent) == 1  # a single approval, never a second one on the next nonce
+    assert quotes == []
@@ -1,64 +1,279 @@
 import json
+import os
 import time
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 import logging
 import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ALCHEMY_URL = "https://base-mainnet.g.alchemy.com/v2/z9EyEduaDQJpEvG52cqnre3aLpW7yH8h"
+UNISWAP_ROUTER_ADDRESS = "0x4752ba5dbc23f44d87826276bf6fd6b1c372ad24"
+
+# Error messages that will never succeed no matter how many times we retry
+FAST_FAIL_MARKERS = (
+    "insufficient funds",
+    "insufficient balance",
+    "transfer amount exceeds balance",
+    "not found in the token file",
+    "invalid address",
+)
+
+
+class TokenNotFoundError(ValueError):
+    """Raised when a token symbol is not present in the token file."""
+
+
+class StuckTransactionError(Exception):
+    """
+    Raised when the trade deadline expires while a transaction is still pending.
+    Retrying would risk a duplicate swap, so this error is never retried.
+    """
+    def __init__(self, message, tx_hashes):
+        super().__init__(message)
+        self.tx_hashes = tx_hashes
+
+
+def is_fast_fail(error):
+    """Returns True if the error (or any error that caused it) can never succeed on retry."""
+    while error is not None:
+        if isinstance(error, (TokenNotFoundError, StuckTransactionError)):
+            return True
+        message = str(error).lower()
+        if any(marker in message for marker in FAST_FAIL_MARKERS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+_json_files = {}
+_json_lock = threading.Lock()
+
+
+def load_json(path):
+    """Parses a JSON file once per process; traders share the token list and router ABI."""
+    path = os.path.abspath(path)
+    with _json_lock:
+        if path not in _json_files:
+            with open(path) as f:
+                _json_files[path] = json.load(f)
+        return _json_files[path]
+
+
+def create_web3(rpc_url=ALCHEMY_URL, pool_size=10):
+    """
+    Web3 connection backed by one pooled HTTP session, to be shared by many
+    traders running in different threads.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    web3 = Web3(Web3.HTTPProvider(rpc_url, session=session))
+    if web3.is_connected():
+        print("Conectado a Base exitosamente ✅")
+    else:
+        raise ConnectionError("No se pudo conectar a la red Base ❌")
+    return web3
+
+
+class MarketCache:
+    """
+    Short-lived, thread-safe cache for gas price and router quotes.
+    One instance can be shared by every trader using the same RPC connection.
+    Concurrent misses on the same key wait for a single loader call.
+    """
+    def __init__(self, ttl=5, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self.key_locks = {}
+        self.lock = threading.Lock()
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            return True, entry[1]
+        return False, None
+
+    def get(self, key, loader):
+        """Returns the cached value for key, calling loader() if it is missing or expired."""
+        with self.lock:
+            found, value = self.lookup(key)
+            if found:
+                return value
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have loaded it while we waited
+            with self.lock:
+                found, value = self.lookup(key)
+            if found:
+                return value
+            value = loader()
+            with self.lock:
+                self.entries[key] = (time.time(), value)
+                self.evict()
+        return value
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def evict(self):
+        """Drops expired entries, then the oldest ones, once max_entries is exceeded. Caller holds self.lock."""
+        if len(self.entries) <= self.max_entries:
+            return
+        now = time.time()
+        for key, (loaded_at, _) in list(self.entries.items()):
+            if now - loaded_at >= self.ttl:
+                del self.entries[key]
+        if len(self.entries) > self.max_entries:
+            oldest = sorted(self.entries, key=lambda key: self.entries[key][0])
+            for key in oldest[:len(self.entries) - self.max_entries]:
+                del self.entries[key]
+        for key in list(self.key_locks):
+            if key not in self.entries and not self.key_locks[key].locked():
+                del self.key_locks[key]
+
+
 class UniswapTrader:
-    def __init__(self, wallet_address, private_key):
-        alchemy_url = "https://base-mainnet.g.alchemy.com/v2/z9EyEduaDQJpEvG52cqnre3aLpW7yH8h"
-        uniswap_router_address = "0x4752ba5dbc23f44d87826276bf6fd6b1c372ad24"
+    trade_timeout = 600      # Overall deadline for a full trade (seconds)
+    stuck_timeout = 45       # Replace a transaction still pending after this many seconds
+    poll_interval = 3        # Seconds between receipt checks
+    gas_bump = 1.125         # Minimum gas price increase accepted for a replacement
+    max_replacements = 5
+
+    def __init__(self, wallet_address, private_key, web3=None, cache=None,
+                 rpc_url=ALCHEMY_URL, router_address=UNISWAP_ROUTER_ADDRESS, router_contract=None):
+        """
+        :param web3: Shared Web3 instance; if None a new connection to rpc_url is opened
+        :param cache: Shared MarketCache for gas price and quotes
+        :param router_contract: Router contract already built on the same web3, to skip re-parsing the ABI
+        """
         token_file = "tokens.json"
-            
-        self.web3 = Web3(Web3.HTTPProvider(alchemy_url))
+
         self.wallet_address = Web3.to_checksum_address(wallet_address)
         self.private_key = private_key
-        self.router_address = Web3.to_checksum_address(uniswap_router_address)
+        self.router_address = Web3.to_checksum_address(router_address)
+        self.cache = cache or MarketCache()
+
+        if web3 is None:
+            self.web3 = Web3(Web3.HTTPProvider(rpc_url))
 
-        # Check connection
-        if self.web3.is_connected():
-            print("Conectado a Base exitosamente ✅")
+            # Check connection
+            if self.web3.is_connected():
+                print("Conectado a Base exitosamente ✅")
+            else:
+                raise ConnectionError("No se pudo conectar a la red Base ❌")
         else:
-            raise ConnectionError("No se pudo conectar a la red Base ❌")
+            self.web3 = web3
 
         # Load tokens from JSON
-        with open(token_file) as f:
-            self.tokens = json.load(f)
+        self.tokens = load_json(token_file)
 
         # Load Uniswap Router ABI
-        with open("uni_abi.json") as f:
-            self.uniswap_abi = json.load(f)
+        self.uniswap_abi = load_json("uni_abi.json")
 
         # Initialize Uniswap contract
-        self.contract = self.web3.eth.contract(address=self.router_address, abi=self.uniswap_abi)
+        if router_contract is not None and router_contract.address == self.router_address:
+            self.contract = router_contract
+        else:
+            self.contract = self.web3.eth.contract(address=self.router_address, abi=self.uniswap_abi)
+
+        # Transactions sent but not yet confirmed: nonce -> list of tx hashes
+        self.pending_transactions = {}
+        # Owner of the trade that sent each pending nonce, so bots sharing this trader only snapshot their own
+        self.pending_owners = {}
+        # Callbacks run whenever pending_transactions or active_trade changes (e.g. to snapshot bot state)
+        self.pending_listeners = []
+        # Two-step trade in progress: symbols, amount and how many legs have finished
+        self.active_trade = None
+
+        # Next nonce known to be free; only advanced after a transaction is accepted
+        self.nonce = 0
+        self.nonce_lock = threading.Lock()
+        self.trade_lock = threading.Lock()
 
     def get_token(self, symbol):
         """Retrieve token details from the JSON file."""
         if symbol not in self.tokens:
-            raise ValueError(f"Token {symbol} not found in the token file.")
+            raise TokenNotFoundError(f"Token {symbol} not found in the token file.")
         token = self.tokens[symbol]
         token['address'] = Web3.to_checksum_address(token['address'])
         return token
 
-    def buy_token(self, amount_eth, token_symbol, slippage=1):
+    def next_nonce(self):
+        """
+        Next nonce for this wallet. Uses the local counter when the RPC node
+        has not yet seen our last transaction in its pending pool. If none of
+        our transactions from the chain nonce on are known to the node anymore
+        (dropped from the mempool), the counter is resynced to the chain so
+        later transactions do not wait behind a nonce gap.
+        """
+        chain_nonce = self.web3.eth.get_transaction_count(self.wallet_address, "pending")
+        with self.nonce_lock:
+            local_nonce = self.nonce
+        if local_nonce <= chain_nonce:
+            return chain_nonce
+
+        gap_nonces = [nonce for nonce in list(self.pending_transactions) if nonce >= chain_nonce]
+        gap_hashes = [tx_hash for nonce in gap_nonces for tx_hash in self.pending_transactions.get(nonce, [])]
+        if gap_hashes and self.is_known(gap_hashes):
+            return local_nonce
+
+        print(f"⚠️ Transactions from nonce {chain_nonce} on are unknown to the node, resyncing nonce from {local_nonce}.")
+        for nonce in gap_nonces:
+            self.forget_transaction(nonce)
+        with self.nonce_lock:
+            self.nonce = chain_nonce
+        return chain_nonce
+
+    def gas_price(self):
+        """Current network gas price, shared across traders through the cache."""
+        return self.cache.get("gas_price", lambda: self.web3.eth.gas_price)
+
+    def get_amount_out(self, amount_in, path):
+        """Router quote for amount_in along path, shared across traders through the cache."""
+        return self.cache.get(
+            ("amount_out", amount_in, tuple(path)),
+            lambda: self.contract.functions.getAmountsOut(amount_in, path).call()[-1]
+        )
+
+    def invalidate_quote(self, amount_in, path):
+        """Drops a cached quote so a retried swap gets a fresh amount_out_min."""
+        if path is not None:
+            self.cache.invalidate(("amount_out", amount_in, tuple(path)))
+
+    def swap_deadline(self, deadline=None):
+        """Router deadline for a swap: the trade deadline if given, else 60 seconds from now."""
+        if deadline is not None:
+            return int(deadline)
+        return int(time.time()) + 60
+
+    def buy_token(self, amount_eth, token_symbol, slippage=1, deadline=None):
         """Swaps ETH for a given token on Uniswap V2."""
+        path = None
         try: 
             token = self.get_token(token_symbol)
             path = [self.get_token("WETH_BASE")['address'], token['address']]
-            amount_out_min = self.contract.functions.getAmountsOut(amount_eth, path).call()[-1]
+            amount_out_min = self.get_amount_out(amount_eth, path)
             amount_out_min = int(amount_out_min * (1 - slippage / 100))
 
             tx = self.contract.functions.swapExactETHForTokens(
-                amount_out_min, path, self.wallet_address, int(time.time()) + 60
+                amount_out_min, path, self.wallet_address, self.swap_deadline(deadline)
             ).build_transaction({
                 'from': self.wallet_address,
                 'value': amount_eth,
-                'gasPrice': self.web3.eth.gas_price,
-                'nonce': self.web3.eth.get_transaction_count(self.wallet_address, "pending")
+                'gasPrice': self.gas_price(),
+                'nonce': self.next_nonce()
             })
 
             try:
@@ -68,58 +283,50 @@ class UniswapTrader:
                 print(f"⚠️ Gas estimation failed: {e}, using fallback gas limit")
                 tx['gas'] = 300000  # Fallback gas limit
 
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            print(f"✅ Transaction sent: {self.web3.to_hex(tx_hash)}")
-
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
-            if receipt is None or receipt.status != 1:
-                raise Exception(f"Transaction failed or not confirmed: {tx_hash.hex()}")
+            receipt = self.send_transaction(tx, deadline=deadline)
             print(f"✅ Transaction confirmed in block {receipt.blockNumber}")
         except Exception as e:
+            self.invalidate_quote(amount_eth, path)
             print(f"Error buying token: {e}")
-            raise Exception(f"Error buying token: {e}")
+            raise Exception(f"Error buying token: {e}") from e
 
-    def sell_token(self, amount_token, token_symbol, slippage=1):
+    def sell_token(self, amount_token, token_symbol, slippage=1, deadline=None):
         """Swaps a given token for ETH on Uniswap V2."""
+        path = None
         try: 
-            self.approve_token(token_symbol, amount_token)  # Approve the token if not already approved
+            self.approve_token(token_symbol, amount_token, deadline=deadline)  # Approve the token if not already approved
             token = self.get_token(token_symbol)
             path = [token['address'], self.get_token("WETH_BASE")['address']]
-            amount_out_min = self.contract.functions.getAmountsOut(amount_token, path).call()[-1]
+            amount_out_min = self.get_amount_out(amount_token, path)
             amount_out_min = int(amount_out_min * (1 - slippage / 100))
 
             tx = self.contract.functions.swapExactTokensForETH(
-                amount_token, amount_out_min, path, self.wallet_address, int(time.time()) + 60
+                amount_token, amount_out_min, path, self.wallet_address, self.swap_deadline(deadline)
             ).build_transaction({
                 'from': self.wallet_address,
-                'gasPrice': self.web3.eth.gas_price,
-                'nonce': self.web3.eth.get_transaction_count(self.wallet_address, "pending"),
+                'gasPrice': self.gas_price(),
+                'nonce': self.next_nonce(),
             })
 
             # Estimate gas limit
             gas_limit = self.web3.eth.estimate_gas(tx)
             tx['gas'] = gas_limit + 10000 # Add 10k gas buffer
 
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            print(f"✅ Transaction sent: {self.web3.to_hex(tx_hash)}")
-
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
-            if receipt is None or receipt.status != 1:
-                raise Exception(f"Transaction failed or not confirmed: {tx_hash.hex()}")
-            
+            receipt = self.send_transaction(tx, deadline=deadline)
             print(f"✅ Transaction confirmed in block {receipt.blockNumber}")
             return amount_out_min
         except Exception as e:
+            self.invalidate_quote(amount_token, path)
             print(f"Error selling token: {e}")
-            raise Exception(f"Error selling token: {e}")
+            raise Exception(f"Error selling token: {e}") from e
             
 
-    def approve_token(self, token_symbol, amount_required=None):
+    def approve_token(self, token_symbol, amount_required=None, deadline=None):
         """
         Approves Uniswap to spend a token if not already approved.
         If amount_required is None, approves the max value.
+        A stuck approval and errors that can never succeed are raised, so the
+        swap does not go ahead (and a retry does not approve again on a new nonce).
         """
         try:
             token = self.get_token(token_symbol)
@@ -138,24 +345,127 @@ class UniswapTrader:
 
             approve_tx = token_contract.functions.approve(self.router_address, max_approval).build_transaction({
                 'from': self.wallet_address,
-                'gasPrice': self.web3.eth.gas_price,
-                'nonce': self.web3.eth.get_transaction_count(self.wallet_address, "pending"),
+                'gasPrice': self.gas_price(),
+                'nonce': self.next_nonce(),
             })
 
             gas_limit = self.web3.eth.estimate_gas(approve_tx)
             approve_tx['gas'] = gas_limit + 10000 # Add 10k gas buffer
 
-            signed_approve_tx = self.web3.eth.account.sign_transaction(approve_tx, self.private_key)
-            approve_tx_hash = self.web3.eth.send_raw_transaction(signed_approve_tx.raw_transaction)
-
-            print(f"🚀 Approval transaction sent: {self.web3.to_hex(approve_tx_hash)}")
-            self.web3.eth.wait_for_transaction_receipt(approve_tx_hash)
+            receipt = self.send_transaction(approve_tx, deadline=deadline)
             print("✅ Approval confirmed.")
-
-            receipt = self.web3.eth.wait_for_transaction_receipt(approve_tx_hash)
             print(f"✅ Transaction confirmed in block {receipt.blockNumber}")
         except Exception as e:
             print(f"Error approving token: {e}")
+            if is_fast_fail(e):
+                raise
+
+    def send_transaction(self, tx, deadline=None):
+        """
+        Signs and sends a transaction, then waits for its receipt.
+        If it is still pending after stuck_timeout seconds, it is replaced with the
+        same nonce and a bumped gas price, so only one of the versions can ever be mined.
+        Raises StuckTransactionError if the deadline expires with the transaction pending.
+        Once a version has been sent, RPC errors never escape as retryable errors,
+        since retrying would build the swap again on a new nonce.
+        """
+        if deadline is None:
+            deadline = time.time() + self.trade_timeout
+
+        nonce = tx['nonce']
+        sent_hashes = self.pending_transactions.setdefault(nonce, [])
+        if self.active_trade is not None:
+            self.pending_owners[nonce] = self.active_trade.get("owner")
+
+        for replacement in range(self.max_replacements + 1):
+            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
+            try:
+                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                sent_hashes.append(tx_hash)
+                with self.nonce_lock:
+                    self.nonce = max(self.nonce, nonce + 1)
+                self.notify_pending_change()
+                label = "Transaction sent" if replacement == 0 else f"Replacement {replacement} sent"
+                print(f"✅ {label}: {self.web3.to_hex(tx_hash)} (gas price: {tx['gasPrice']})")
+            except Exception as e:
+                # A previous version may have been mined or is still in the mempool
+                if not sent_hashes:
+                    self.forget_transaction(nonce)
+                    raise
+                print(f"⚠️ Replacement rejected: {e}")
+
+            wait_until = min(deadline, time.time() + self.stuck_timeout)
+            receipt = self.wait_for_any_receipt(sent_hashes, wait_until)
+            if receipt is not None:
+                self.forget_transaction(nonce)
+                if receipt.status != 1:
+                    raise Exception(f"Transaction failed: {self.web3.to_hex(receipt.transactionHash)}")
+                return receipt
+
+            if time.time() >= deadline or replacement == self.max_replacements:
+                break
+
+            try:
+                network_gas_price = self.web3.eth.gas_price
+            except Exception as e:
+                print(f"⚠️ Could not read gas price: {e}")
+                network_gas_price = 0
+            tx['gasPrice'] = max(int(tx['gasPrice'] * self.gas_bump) + 1, network_gas_price)
+            print(f"⏳ Transaction with nonce {nonce} still pending, bumping gas price to {tx['gasPrice']}")
+
+        hashes = [self.web3.to_hex(h) for h in sent_hashes]
+        raise StuckTransactionError(f"Transaction with nonce {nonce} still pending: {hashes}", hashes)
+
+    def notify_pending_change(self):
+        for listener in self.pending_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"⚠️ Pending transaction callback failed: {e}")
+
+    def forget_transaction(self, nonce):
+        """Stops tracking a nonce once it is mined, replaced or dropped by the node."""
+        self.pending_transactions.pop(nonce, None)
+        self.pending_owners.pop(nonce, None)
+        self.notify_pending_change()
+
+    def get_pending_hashes(self, owner=None):
+        """Hex hashes of every unconfirmed transaction (only those sent by owner's trades if given), by nonce."""
+        return {
+            nonce: [self.web3.to_hex(tx_hash) for tx_hash in hashes]
+            for nonce, hashes in list(self.pending_transactions.items())
+            if owner is None or self.pending_owners.get(nonce) == owner
+        }
+
+    def is_known(self, tx_hashes):
+        """True if the node still has any of the transactions, mined or waiting in its mempool."""
+        for tx_hash in tx_hashes:
+            try:
+                self.web3.eth.get_transaction(tx_hash)
+                return True
+            except TransactionNotFound:
+                continue
+            except Exception as e:
+                print(f"⚠️ Could not look up transaction {self.web3.to_hex(tx_hash)}: {e}")
+                return True
+        return False
+
+    def wait_for_any_receipt(self, tx_hashes, wait_until):
+        """
+        Polls the given transaction hashes until one of them is mined or wait_until is reached.
+        RPC errors while polling are treated as transient and polling continues.
+        """
+        while True:
+            for tx_hash in tx_hashes:
+                try:
+                    return self.web3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    continue
+                except Exception as e:
+                    print(f"⚠️ Error polling transaction {self.web3.to_hex(tx_hash)}: {e}")
+            if time.time() >= wait_until:
+                return None
+            time.sleep(min(self.poll_interval, max(0, wait_until - time.time())))
     
     def monitor_transaction(self, tx_hash, timeout=120):
         """Monitors the status of a transaction."""
@@ -189,54 +499,173 @@ class UniswapTrader:
             decimals = token.get('decimals', 18)  # Default to 18 decimals if not specified
             return balance / (10 ** decimals)
         
-    def trade(self, input_token_symbol, output_token_symbol, amount, slippage=1):
+    def get_account_snapshot(self, address, token_symbols):
+        """
+        Reads the balances of the given tokens (None = ETH) and the latest
+        mined nonce of address in a single batched RPC request.
+        The batch is posted straight through the provider instead of
+        web3.batch_requests(), whose batching flag is shared by every thread
+        using this connection.
+        :return: (dict of token_symbol -> balance, latest_nonce)
+        """
+        checksum_address = self.web3.to_checksum_address(address)
+
+        calls = []
+        for token_symbol in token_symbols:
+            if token_symbol is None:
+                calls.append(("eth_getBalance", [checksum_address, "latest"]))
+            else:
+                token = self.get_token(token_symbol)
+                token_contract = self.web3.eth.contract(address=token['address'], abi=token['abi'])
+                data = token_contract.encode_abi("balanceOf", args=[checksum_address])
+                calls.append(("eth_call", [{"to": token['address'], "data": data}, "latest"]))
+        calls.append(("eth_getTransactionCount", [checksum_address, "latest"]))
+
+        responses = self.web3.provider.make_batch_request(calls)
+        if not isinstance(responses, list):
+            raise Exception(f"Batch request failed: {responses.get('error')}")
+        results = []
+        for (method, _), response in zip(calls, responses):
+            if "error" in response:
+                raise Exception(f"{method} failed: {response['error']}")
+            results.append(int(response["result"], 16))
+
+        balances = {}
+        for token_symbol, raw_balance in zip(token_symbols, results):
+            if token_symbol is None:
+                balances[token_symbol] = float(self.web3.from_wei(raw_balance, 'ether'))
+            else:
+                decimals = self.get_token(token_symbol).get('decimals', 18)
+                balances[token_symbol] = raw_balance / (10 ** decimals)
+        return balances, results[-1]
+
+    def trade(self, input_token_symbol, output_token_symbol, amount, slippage=1, owner=None, action=None):
         """
         Generalized trade function that supports non-ETH token swaps.
         Steps:
         1. If input ≠ ETH, sell input for ETH.
         2. If output ≠ ETH, buy output using ETH.
+        Both steps share a single deadline of trade_timeout seconds. Progress is
+        kept in active_trade (tagged with owner) so an interrupted trade can be
+        finished with finish_trade.
         
         :param input_token_symbol: Token you are selling (e.g., "USDC_BASE")
         :param output_token_symbol: Token you are buying (e.g., "DEGEN")
         :param amount: Amount of input token (raw units, e.g., USDC = 6 decimals)
+        :param action: Caller's own record of the trade, kept in active_trade so it can be applied on resume
         """
-        WETH = "WETH_BASE"
+        # Trades from different bots on this wallet run one at a time, keeping nonces in order
+        with self.trade_lock:
+            WETH = "WETH_BASE"
+            deadline = time.time() + self.trade_timeout
+
+            input_token = self.get_token(input_token_symbol)
+            input_decimals = input_token.get("decimals", 18)
+            amount = int(amount * (10 ** input_decimals))
+
+            self.active_trade = {
+                "owner": owner,
+                "input": input_token_symbol,
+                "output": output_token_symbol,
+                "amount": amount,
+                "slippage": slippage,
+                "completed_leg": 0,
+                "eth_amount": None,
+                "action": action,
+            }
+            self.notify_pending_change()
 
-        input_token = self.get_token(input_token_symbol)
-        input_decimals = input_token.get("decimals", 18)
-        amount = int(amount * (10 ** input_decimals))
-        
-        if input_token_symbol != WETH:
-            print(f"🔄 Step 1: Swapping {input_token_symbol} → ETH...")
-            eth_amount = self.retry_until_success(
-                self.sell_token, amount, input_token_symbol, slippage=slippage
-            )
-
-            # Optional: wait a bit for confirmation
-            time.sleep(5)
-        else:
-            eth_amount = amount  # If input is ETH, use directly
+            try:
+                if input_token_symbol != WETH:
+                    print(f"🔄 Step 1: Swapping {input_token_symbol} → ETH...")
+                    eth_amount = self.retry_until_success(
+                        self.sell_token, amount, input_token_symbol, slippage=slippage, deadline=deadline
+                    )
+                else:
+                    eth_amount = amount  # If input is ETH, use directly
+
+                self.active_trade["completed_leg"] = 1
+                self.active_trade["eth_amount"] = eth_amount
+                self.notify_pending_change()
+
+                if input_token_symbol != WETH:
+                    # Optional: wait a bit for confirmation
+                    time.sleep(5)
+
+                self.buy_output(eth_amount, output_token_symbol, slippage, deadline)
+            except Exception:
+                self.abandon_trade()
+                raise
+
+    def finish_trade(self, active_trade):
+        """Runs the ETH → output leg of a trade that was interrupted after its first leg."""
+        with self.trade_lock:
+            self.active_trade = dict(active_trade)
+            deadline = time.time() + self.trade_timeout
+            try:
+                self.buy_output(active_trade["eth_amount"], active_trade["output"], active_trade["slippage"], deadline)
+            except Exception:
+                self.abandon_trade()
+                raise
 
-        if output_token_symbol != WETH:
+    def abandon_trade(self):
+        """
+        Clears active_trade after a leg failed, unless one of its transactions
+        is still pending and may yet be mined; that is left for reconcile_state.
+        """
+        owner = self.active_trade.get("owner") if self.active_trade else None
+        if not any(self.pending_owners.get(nonce) == owner for nonce in list(self.pending_transactions)):
+            self.active_trade = None
+            self.notify_pending_change()
+
+    def clear_active_trade(self, owner):
+        """Drops owner's leftover trade once it has been reconciled. A trade running now has already replaced it."""
+        if not self.trade_lock.acquire(blocking=False):
+            return
+        try:
+            if self.active_trade is not None and self.active_trade.get("owner") == owner:
+                self.active_trade = None
+                self.notify_pending_change()
+        finally:
+            self.trade_lock.release()
+
+    def buy_output(self, eth_amount, output_token_symbol, slippage, deadline):
+        """Second leg of a trade; clears active_trade once it is done."""
+        if output_token_symbol != "WETH_BASE":
             print(f"🔄 Step 2: Swapping ETH → {output_token_symbol}...")
             self.retry_until_success(
-                self.buy_token, eth_amount, output_token_symbol, slippage=slippage
+                self.buy_token, eth_amount, output_token_symbol, slippage=slippage, deadline=deadline
             )
         else:
             print("✅ Output is ETH, no need for second swap.")
 
-    def retry_until_success(self, func, *args, retries=5, delay=10, **kwargs):
+        self.active_trade = None
+        self.notify_pending_change()
+
+    def retry_until_success(self, func, *args, retries=5, delay=2, max_delay=30, deadline=None, **kwargs):
+        """
+        Calls func until it succeeds, with capped exponential backoff.
+        Errors that can never succeed fail immediately, and no retry is
+        started once the deadline (also passed on to func) has passed.
+        """
+        if deadline is None:
+            deadline = time.time() + self.trade_timeout
+
         for attempt in range(retries):
             try:
-                return func(*args, **kwargs)
+                return func(*args, deadline=deadline, **kwargs)
             except Exception as e:
                 print(f"⚠️ Attempt {attempt + 1} failed: {e}")
-                if attempt < retries - 1:
-                    sleep_time = delay + random.randint(0, 5)
-                    print(f"🔁 Retrying in {sleep_time} seconds...")
+                if is_fast_fail(e):
+                    print("❌ Error cannot be fixed by retrying.")
+                    raise
+
+                remaining = deadline - time.time()
+                if attempt < retries - 1 and remaining > 0:
+                    sleep_time = min(max_delay, delay * 2 ** attempt) + random.uniform(0, delay)
+                    sleep_time = min(sleep_time, remaining)
+                    print(f"🔁 Retrying in {sleep_time:.1f} seconds...")
                     time.sleep(sleep_time)
                 else:
                     print("❌ All retry attempts failed.")
                     raise
-
-
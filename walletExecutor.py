@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from web3 import Web3
+from uniswapTrader import UniswapTrader, MarketCache, create_web3, ALCHEMY_URL, UNISWAP_ROUTER_ADDRESS
+
+
+class WalletExecutor:
+    """
+    Executes the same trades across many wallets concurrently.
+
+    Every wallet gets its own single-thread lane, so its trades (and nonces) stay
+    in order while different wallets sign and submit in parallel. All wallets share
+    one HTTP connection pool, one Web3 instance and one gas/quote cache.
+
+    devchainFanout.py runs a fan-out against a local anvil fork of Base using
+    anvil's prefunded accounts and compares it with a single trade.
+    """
+    def __init__(self, wallets, rpc_url=ALCHEMY_URL, router_address=UNISWAP_ROUTER_ADDRESS, cache_ttl=5):
+        """
+        :param wallets: List of (wallet_address, private_key) pairs
+        """
+        if not wallets:
+            raise ValueError("At least one wallet is required.")
+
+        # One connection pool big enough for every lane to have a request in flight
+        self.web3 = create_web3(rpc_url, pool_size=len(wallets))
+        self.cache = MarketCache(ttl=cache_ttl)
+
+        self.traders = {}
+        self.lanes = {}
+        router_contract = None
+        for wallet_address, private_key in wallets:
+            trader = UniswapTrader(
+                wallet_address=wallet_address,
+                private_key=private_key,
+                web3=self.web3,
+                cache=self.cache,
+                router_address=router_address,
+                router_contract=router_contract,
+            )
+            router_contract = trader.contract
+            self.traders[trader.wallet_address] = trader
+            self.lanes[trader.wallet_address] = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"lane-{trader.wallet_address[:10]}"
+            )
+
+    def submit(self, wallet_address, input_token_symbol, output_token_symbol, amount, slippage=1):
+        """Queues a trade on the wallet's lane and returns its Future."""
+        wallet_address = Web3.to_checksum_address(wallet_address)
+        trader = self.traders[wallet_address]
+        return self.lanes[wallet_address].submit(
+            trader.trade, input_token_symbol, output_token_symbol, amount, slippage=slippage
+        )
+
+    def trade_all(self, input_token_symbol, output_token_symbol, amounts, slippage=1):
+        """
+        Fans one trade out to every wallet and waits for all of them.
+
+        :param amounts: Amount for every wallet, or a dict of wallet_address -> amount
+        :return: Dict of wallet_address -> None on success, or the exception raised
+        """
+        start = time.time()
+        if isinstance(amounts, dict):
+            amounts = {Web3.to_checksum_address(address): amount for address, amount in amounts.items()}
+
+        futures = {}
+        for wallet_address in self.traders:
+            amount = amounts.get(wallet_address) if isinstance(amounts, dict) else amounts
+            if amount:
+                futures[wallet_address] = self.submit(
+                    wallet_address, input_token_symbol, output_token_symbol, amount, slippage=slippage
+                )
+
+        wait(futures.values())
+
+        results = {}
+        for wallet_address, future in futures.items():
+            error = future.exception()
+            results[wallet_address] = error
+            if error is None:
+                print(f"✅ {wallet_address}: {input_token_symbol} → {output_token_symbol} done")
+            else:
+                print(f"❌ {wallet_address}: {error}")
+
+        print(f"⏱️ {len(futures)} wallet trades finished in {time.time() - start:.1f} seconds")
+        return results
+
+    def shutdown(self, wait_for_trades=True):
+        """Stops every lane, by default after its queued trades finish."""
+        for lane in self.lanes.values():
+            lane.shutdown(wait=wait_for_trades)